@@ -0,0 +1,654 @@
+import hashlib
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import sklearn
+from econml.grf import CausalForest
+from joblib import Parallel, delayed
+from scipy import stats
+from sklearn.base import clone
+from sklearn.linear_model import LassoCV
+from sklearn.model_selection import KFold, cross_val_predict
+
+from auxiliary.auxiliary_regressions import map_shared, shared_frame
+
+
+# the forest settings of the causal forest cell of the notebook
+_FOREST_PARAMS = {
+    "criterion": "het",
+    "min_samples_leaf": 10,
+    "max_depth": None,
+    "max_samples": 0.5,
+    "honest": True,
+    "inference": True,
+}
+
+
+def _class_path(value):
+    return type(value).__module__ + "." + type(value).__qualname__
+
+
+def _model_spec(model):
+    # the class of a model and all its parameters, also those left at their
+    # defaults and those of nested models, which get_params(deep=True) lists
+    # by their own names; arrays are hashed, as their repr is truncated. The
+    # number of jobs does not change the fit, so it is left out
+    params = []
+    for name, value in sorted(model.get_params(deep=True).items()):
+        if name.split("__")[-1] == "n_jobs":
+            continue
+        if hasattr(value, "get_params"):
+            value = _class_path(value)
+        elif isinstance(value, np.ndarray):
+            digest = hashlib.sha256(np.ascontiguousarray(value)).hexdigest()
+            value = (value.dtype.str, value.shape, digest)
+        params.append((name, value))
+    return _class_path(model), params
+
+
+def _residuals_cache_path(y, t, X, model_y, model_t, cv, seed, cache_dir):
+    # named by the hash of the data, the nuisance models, the sklearn version
+    # and the folds
+    key = hashlib.sha256()
+    for values in [y, t, X]:
+        key.update(np.ascontiguousarray(values).tobytes())
+        key.update(str(values.shape).encode())
+    nuisance = (_model_spec(model_y), _model_spec(model_t), sklearn.__version__)
+    key.update(repr((nuisance, cv, seed)).encode())
+    return os.path.join(cache_dir, "residuals_" + key.hexdigest()[:16] + ".npz")
+
+
+def cross_fitted_residuals(
+    Y,
+    T,
+    X,
+    model_y=None,
+    model_t=None,
+    cv=10,
+    seed=0,
+    n_jobs=-1,
+    cache_dir="out/cache/nuisance",
+):
+    # The first stage of CausalForestDML: Y - E[Y|X] and T - E[T|X], each
+    # predicted by a model fitted on the other folds (LassoCV by default). The
+    # folds of both models are fitted in parallel. The residuals do not depend
+    # on the forest, so they are stored in cache_dir (None to not cache) under
+    # the hash of the data, the models and the fold seed, and forest refits
+    # read them back instead of fitting the nuisance models again
+    model_y = LassoCV() if model_y is None else model_y
+    model_t = LassoCV() if model_t is None else model_t
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(Y, dtype=float).reshape(-1)
+    t = np.asarray(T, dtype=float).reshape(-1)
+    if cache_dir is not None:
+        cache_path = _residuals_cache_path(
+            y, t, X, model_y, model_t, cv, seed, cache_dir
+        )
+        # a truncated or otherwise unreadable file is removed and refitted
+        try:
+            with np.load(cache_path, allow_pickle=False) as cached:
+                return cached["y_res"], cached["t_res"]
+        except FileNotFoundError:
+            pass
+        except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+            try:
+                os.remove(cache_path)
+            except FileNotFoundError:
+                pass
+
+    folds = KFold(cv, shuffle=True, random_state=seed)
+    y_res = y - cross_val_predict(clone(model_y), X, y, cv=folds, n_jobs=n_jobs)
+    t_res = t - cross_val_predict(clone(model_t), X, t, cv=folds, n_jobs=n_jobs)
+
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = cache_path + ".tmp.npz"
+        np.savez(temp_path, y_res=y_res, t_res=t_res)
+        os.replace(temp_path, cache_path)
+    return y_res, t_res
+
+
+def _ate_interval(forest, X, alpha):
+    # The ATE over the rows of X and its interval, by the bootstrap of little
+    # bags that CausalForest.predict_interval runs for a single row, applied to
+    # the moments averaged over the rows: every tree gives the ATE its moments
+    # imply, the subforests (each grown on one half-sample) vary by the
+    # variance of the ATE plus the noise of their trees, which is subtracted,
+    # and the difference is debiased as econml does for a positive variance
+    alpha_hat, jac = forest.predict_alpha_and_jac(X)
+    invjac = np.linalg.pinv(jac)
+    parameter = np.einsum("ijk,ik->ij", invjac, alpha_hat)
+
+    def tree_effects(trees):
+        effects = []
+        for tree in trees:
+            moment = forest.estimators_[tree].predict_moment(X, parameter)
+            effects.append(np.einsum("ij,ij->i", invjac[:, 0], moment).mean())
+        return effects
+
+    effects = np.array(
+        Parallel(n_jobs=forest.n_jobs, backend="threading")(
+            delayed(tree_effects)(trees) for trees in forest.slices_
+        )
+    )
+    bags = effects.mean(axis=1)
+    var_between = np.mean(bags**2) - np.mean(bags) ** 2
+    correction = (np.mean(effects**2) - np.mean(bags**2)) / (effects.shape[1] - 1)
+    naive = var_between - correction
+    scale = max(var_between, correction) * np.sqrt(2 / len(bags))
+    z = naive / max(scale, 1e-10)
+    var = naive + scale * stats.norm.pdf(z) / stats.norm.cdf(z)
+
+    ate = parameter[:, 0].mean()
+    half_width = stats.norm.ppf(1 - alpha / 2) * np.sqrt(var)
+    return ate, ate - half_width, ate + half_width
+
+
+class CausalForestRun:
+    """
+    A causal forest grown in batches of trees on cross-fitted residuals.
+
+    effect, effect_interval and const_marginal_ate work as the methods of
+    CausalForestDML of the same name. ate_interval is the interval of the ATE
+    over the rows of X from the variance of the ATE between the subforests,
+    where CausalForestDML.ate_interval bounds it by the mean of the CATE
+    standard errors. history has the ATE over the monitoring rows and this
+    interval after every batch.
+    """
+
+    def __init__(self, forest, history):
+        self.forest = forest
+        self.history = history
+
+    def effect(self, X):
+        return self.forest.predict(np.asarray(X, dtype=float)).reshape(-1)
+
+    def effect_interval(self, X, alpha=0.1):
+        lower, upper = self.forest.predict_interval(
+            np.asarray(X, dtype=float), alpha=alpha
+        )
+        return lower.reshape(-1), upper.reshape(-1)
+
+    def const_marginal_ate(self, X):
+        return np.mean(self.effect(X))
+
+    def ate_interval(self, X, alpha=0.1):
+        _, lower, upper = _ate_interval(self.forest, np.asarray(X, dtype=float), alpha)
+        return lower, upper
+
+
+def fit_causal_forest(
+    Y,
+    T,
+    X,
+    X_monitor=None,
+    sample_weight=None,
+    n_estimators=10000,
+    batch_size=500,
+    min_estimators=1000,
+    tol=0.02,
+    alpha=0.05,
+    cv=10,
+    model_y=None,
+    model_t=None,
+    seed=0,
+    n_jobs=-1,
+    cache_dir="out/cache/nuisance",
+    **forest_params,
+):
+    # CausalForestDML(n_estimators=n_estimators, cv=cv, ...).fit(Y, T, X=X)
+    # with the nuisance folds fitted in parallel and the forest grown by
+    # warm starting batch_size trees at a time (on all cores). After every
+    # batch the ATE over X_monitor (up to 1000 rows of X by default) and its
+    # 1 - alpha interval are recorded; the forest stops growing once it has at
+    # least min_estimators trees and none of the three moved by more than tol
+    # times the width of the interval over the last batch. The residuals come
+    # from the nuisance cache when the data, models and folds were fitted before.
+    # sample_weight weights the rows in the forest, not in the nuisance models
+    y_res, t_res = cross_fitted_residuals(
+        Y, T, X, model_y, model_t, cv=cv, seed=seed, n_jobs=n_jobs, cache_dir=cache_dir
+    )
+    X = np.asarray(X, dtype=float)
+    if X_monitor is None:
+        rng = np.random.default_rng(seed)
+        X_monitor = X[rng.choice(len(X), min(len(X), 1000), replace=False)]
+    X_monitor = np.asarray(X_monitor, dtype=float)
+
+    forest = CausalForest(
+        warm_start=True,
+        n_jobs=n_jobs,
+        random_state=seed,
+        **{**_FOREST_PARAMS, **forest_params},
+    )
+    # with inference the trees are grown in subforests of subforest_size
+    batch_size += -batch_size % forest.subforest_size
+
+    history = []
+    n_trees = 0
+    while n_trees < n_estimators:
+        n_trees = min(n_trees + batch_size, n_estimators)
+        forest.set_params(n_estimators=n_trees)
+        forest.fit(X, t_res, y_res, sample_weight=sample_weight)
+        history.append((n_trees, *_ate_interval(forest, X_monitor, alpha)))
+        if n_trees >= min_estimators and len(history) > 1:
+            change = np.subtract(history[-1][1:], history[-2][1:])
+            if np.max(np.abs(change)) < tol * (history[-1][3] - history[-1][2]):
+                break
+
+    history = pd.DataFrame(history, columns=["n_estimators", "ate", "lower", "upper"])
+    return CausalForestRun(forest, history.set_index("n_estimators"))
+
+
+class ProfileCATE:
+    """
+    CATEs of a covariate set with few distinct values, one per profile of X.
+
+    profiles has a row for every distinct X in the fitted data with its effect,
+    standard error and number of observations. effect, effect_interval and
+    const_marginal_ate work as the methods of CausalForestDML; rows of X that
+    were not in the fitted data, and rows of profiles in which the treatment
+    does not vary, get NaN.
+    """
+
+    def __init__(self, profiles):
+        self.profiles = profiles
+
+    def _lookup(self, X, column):
+        X = pd.DataFrame(np.asarray(X, dtype=float))
+        keys = self.profiles.iloc[:, : X.shape[1]]
+        X.columns = keys.columns
+        matched = X.merge(
+            keys.assign(**{column: self.profiles[column]}), how="left"
+        )
+        return matched[column].to_numpy()
+
+    def effect(self, X):
+        return self._lookup(X, "effect")
+
+    def effect_interval(self, X, alpha=0.1):
+        effect = self.effect(X)
+        half_width = stats.norm.ppf(1 - alpha / 2) * self._lookup(X, "se")
+        return effect - half_width, effect + half_width
+
+    def const_marginal_ate(self, X):
+        return np.mean(self.effect(X))
+
+
+def fit_profile_cate(
+    Y,
+    T,
+    X,
+    sample_weight=None,
+    bootstrap=0,
+    cv=10,
+    model_y=None,
+    model_t=None,
+    seed=0,
+    n_jobs=-1,
+    cache_dir="out/cache/nuisance",
+    tol=1e-10,
+):
+    # The causal forest on a covariate set with few distinct values: with the
+    # same cross-fitted residuals, the effect of a profile x of X is the slope
+    # of y_res on t_res over its rows with an intercept, as in the leaves of
+    # CausalForest(fit_intercept=True). The nuisance models are not saturated
+    # in the profiles, so both residuals are first centered within each
+    # profile. With sample_weight the slopes and means are weighted (the
+    # nuisance models are fitted without weights: centering within the
+    # profiles takes out their predictions, which depend only on X, up to the
+    # differences between folds). The standard errors are the sandwich ones of
+    # this slope, or with bootstrap > 0 the standard deviation over bootstrap
+    # replications with Poisson(1) row weights.
+    # When the treatment does not vary within a profile (its variance there is
+    # at most tol times the overall one), as when T is a function of X, the
+    # centered t_res is only the noise of the nuisance fits across folds and
+    # the effect is not identified: effect and se are NaN for that profile
+    y_res, t_res = cross_fitted_residuals(
+        Y, T, X, model_y, model_t, cv=cv, seed=seed, n_jobs=n_jobs, cache_dir=cache_dir
+    )
+    columns = X.columns if isinstance(X, pd.DataFrame) else range(np.shape(X)[1])
+    t = np.asarray(T, dtype=float).reshape(-1)
+    if sample_weight is None:
+        sample_weight = np.ones(len(t))
+    sample_weight = np.asarray(sample_weight, dtype=float).reshape(-1)
+    X = np.asarray(X, dtype=float)
+    profiles, codes, counts = np.unique(
+        X, axis=0, return_inverse=True, return_counts=True
+    )
+    codes = codes.reshape(-1)
+    n_profiles = len(profiles)
+
+    def profile_mean(values, weights):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (
+                np.bincount(codes, weights * values, n_profiles)
+                / np.bincount(codes, weights, n_profiles)
+            )[codes]
+
+    # profiles without variation in the treatment
+    t_mean = np.average(t, weights=sample_weight)
+    t_within = np.bincount(
+        codes, sample_weight * (t - profile_mean(t, sample_weight)) ** 2, n_profiles
+    )
+    t_total = np.sum(sample_weight * (t - t_mean) ** 2)
+    constant = t_within <= tol * max(t_total, np.finfo(float).tiny)
+
+    def profile_effects(weights):
+        t_centered = t_res - profile_mean(t_res, weights)
+        y_centered = y_res - profile_mean(y_res, weights)
+        numerator = np.bincount(codes, weights * t_centered * y_centered, n_profiles)
+        denominator = np.bincount(codes, weights * t_centered**2, n_profiles)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            effect = np.where(constant, np.nan, numerator / denominator)
+        return effect, t_centered, y_centered, denominator
+
+    effect, t_centered, y_centered, denominator = profile_effects(sample_weight)
+    if bootstrap > 0:
+        rng = np.random.default_rng(seed)
+        draws = np.empty((bootstrap, n_profiles))
+        for b in range(bootstrap):
+            draws[b] = profile_effects(sample_weight * rng.poisson(1.0, len(codes)))[0]
+        with np.errstate(invalid="ignore"):
+            se = np.nanstd(draws, axis=0, ddof=1)
+        se[constant] = np.nan
+    else:
+        residuals = y_centered - effect[codes] * t_centered
+        scores = sample_weight * t_centered * residuals
+        with np.errstate(divide="ignore", invalid="ignore"):
+            se = np.sqrt(np.bincount(codes, scores**2, n_profiles)) / denominator
+
+    profiles = pd.DataFrame(profiles, columns=list(columns))
+    profiles["effect"] = effect
+    profiles["se"] = se
+    profiles["nobs"] = counts
+    return ProfileCATE(profiles)
+
+
+def fit_cate(
+    Y,
+    T,
+    X,
+    sample_weight=None,
+    max_profiles=64,
+    bootstrap=0,
+    cv=10,
+    model_y=None,
+    model_t=None,
+    seed=0,
+    n_jobs=-1,
+    cache_dir="out/cache/nuisance",
+    **forest_args,
+):
+    # fit_profile_cate when X has at most max_profiles distinct rows (such as a
+    # set of binary covariates), else fit_causal_forest with forest_args, both
+    # with the row weights sample_weight (as CausalForestDML.fit takes them).
+    # forest_args are only passed on to the forest, so they raise a TypeError
+    # when the profiles are used instead of being ignored
+    nuisance_args = dict(
+        cv=cv,
+        model_y=model_y,
+        model_t=model_t,
+        seed=seed,
+        n_jobs=n_jobs,
+        cache_dir=cache_dir,
+    )
+    values = np.asarray(X, dtype=float)
+    n_profiles = len(np.unique(values, axis=0))
+    if n_profiles <= max_profiles:
+        if forest_args:
+            raise TypeError(
+                f"X has {n_profiles} distinct rows (at most max_profiles="
+                f"{max_profiles}), so the CATEs are estimated per profile and "
+                f"the forest arguments {sorted(forest_args)} do not apply"
+            )
+        return fit_profile_cate(
+            Y, T, X, sample_weight, bootstrap=bootstrap, **nuisance_args
+        )
+    return fit_causal_forest(
+        Y, T, X, sample_weight=sample_weight, **nuisance_args, **forest_args
+    )
+
+
+# the fitted model of the scoring workers, set once per process
+_scoring_model = {}
+
+
+def _single_threaded(model):
+    # the forests the model predicts with (its own, or those of the final
+    # model of CausalForestDML) run on one core, as every worker process
+    # already scores a chunk of its own
+    final = getattr(model, "model_final_", None)
+    parts = [model, getattr(model, "forest", None)]
+    for part in parts + list(getattr(final, "estimators_", [])):
+        if hasattr(part, "n_jobs"):
+            part.n_jobs = 1
+
+
+def _attach_scoring_model(model, single_threaded=False):
+    if single_threaded:
+        _single_threaded(model)
+    _scoring_model["model"] = model
+
+
+def _score_chunk(values, alpha):
+    model = _scoring_model["model"]
+    lower, upper = model.effect_interval(values, alpha=alpha)
+    return model.effect(values), lower, upper
+
+
+def _covariate_chunks(X, chunk_size):
+    # X is one frame or array, or an iterable of them (such as
+    # pd.read_csv(..., chunksize=...)), cut into chunks of at most chunk_size rows
+    batches = [X] if isinstance(X, (pd.DataFrame, np.ndarray)) else X
+    for batch in batches:
+        for start in range(0, len(batch), chunk_size):
+            yield batch[start : start + chunk_size]
+
+
+def _scored_batch(chunk, keep, scores):
+    arrays = [pa.Array.from_pandas(chunk[name]) for name in keep]
+    arrays += [
+        pa.array(np.asarray(score, dtype=float).reshape(-1)) for score in scores
+    ]
+    return pa.RecordBatch.from_arrays(arrays, keep + ["effect", "lower", "upper"])
+
+
+def score_cate(
+    model,
+    X,
+    path,
+    covariates=None,
+    keep=None,
+    chunk_size=100000,
+    alpha=0.1,
+    max_workers=None,
+):
+    # Scores the rows of X with a fitted model (fit_cate, fit_causal_forest or
+    # CausalForestDML) and writes effect, lower and upper, after the keep
+    # columns of X (such as dist or hhid, which needs X as data frames), to the
+    # feather file at path. The rows are scored chunk_size at a time on the
+    # covariates columns of X (all of them by default); with more than one
+    # worker the model is sent to every worker process once, where it predicts
+    # on one core, and the chunks are scored in a process pool. Every chunk is
+    # written as soon as it and the chunks before it are done, so neither X
+    # (when it is an iterable of batches) nor the output has to fit in memory.
+    # Without any row the file is still written, with no rows. Returns the
+    # number of rows written
+    max_workers = max_workers or os.cpu_count() or 1
+    keep = [] if keep is None else list(keep)
+    writer = None
+    nrows = 0
+
+    def chunks():
+        if keep and isinstance(X, np.ndarray):
+            raise TypeError("keep needs X as a data frame or data frames")
+        for chunk in _covariate_chunks(X, chunk_size):
+            if keep and not isinstance(chunk, pd.DataFrame):
+                raise TypeError("keep needs X as a data frame or data frames")
+            yield chunk
+
+    def write(chunk, scores):
+        nonlocal writer, nrows
+        batch = _scored_batch(chunk, keep, scores)
+        if writer is None:
+            writer = pa.ipc.new_file(path, batch.schema)
+        writer.write_batch(batch)
+        nrows += len(chunk)
+
+    def values(chunk):
+        if covariates is not None:
+            chunk = chunk[covariates]
+        return np.asarray(chunk, dtype=float)
+
+    try:
+        if max_workers <= 1:
+            _attach_scoring_model(model)
+            try:
+                for chunk in chunks():
+                    write(chunk, _score_chunk(values(chunk), alpha))
+            finally:
+                _scoring_model.clear()
+        else:
+            with ProcessPoolExecutor(
+                max_workers, initializer=_attach_scoring_model, initargs=(model, True)
+            ) as pool:
+                # at most two chunks per worker are in flight at any time
+                pending = deque()
+                for chunk in chunks():
+                    if len(pending) == 2 * max_workers:
+                        done, future = pending.popleft()
+                        write(done, future.result())
+                    pending.append(
+                        (chunk, pool.submit(_score_chunk, values(chunk), alpha))
+                    )
+                while pending:
+                    chunk, future = pending.popleft()
+                    write(chunk, future.result())
+        if writer is None:
+            if isinstance(X, pd.DataFrame):
+                empty = X[keep].iloc[:0]
+            else:
+                empty = pd.DataFrame({name: np.empty(0) for name in keep})
+            write(empty, [np.empty(0)] * 3)
+    finally:
+        if writer is not None:
+            writer.close()
+    return nrows
+
+
+def backdoor_linear_effect(y, t, W, weights=None):
+    # the backdoor.linear_regression estimate of DoWhy: the coefficient of t in
+    # the (weighted) regression of y on a constant, t and the common causes W,
+    # from the normal equations. As in statsmodels, which DoWhy fits with, a
+    # collinear design (a subset or bootstrap sample in which a common cause
+    # does not vary) gives the minimum norm solution instead of an error
+    Z = np.column_stack([np.ones(len(y)), t, W])
+    Zw = Z if weights is None else Z * weights[:, None]
+    return (np.linalg.pinv(Zw.T @ Z) @ (Zw.T @ y))[1]
+
+
+# the names of the DoWhy refuters that refute_backdoor_linear runs by default;
+# their settings (num_simulations, subset_fraction) are its arguments
+REFUTERS = [
+    "placebo_treatment_refuter",
+    "random_common_cause",
+    "data_subset_refuter",
+    "bootstrap_refuter",
+]
+
+
+def _refutation_draws(refuter, treatment, outcome, common_causes, seed, n, subset):
+    data = shared_frame()
+    y = data[outcome].to_numpy()
+    t = data[treatment].to_numpy()
+    W = data[common_causes].to_numpy()
+    rng = np.random.default_rng(seed)
+    draws = np.empty(n)
+    for i in range(n):
+        if refuter == "placebo_treatment_refuter":
+            # the treatment permuted across the rows
+            draws[i] = backdoor_linear_effect(y, rng.permutation(t), W)
+        elif refuter == "random_common_cause":
+            # an independent standard normal column added to the common causes
+            W_random = np.column_stack([W, rng.standard_normal(len(y))])
+            draws[i] = backdoor_linear_effect(y, t, W_random)
+        elif refuter == "data_subset_refuter":
+            # a random share subset of the rows as 0/1 weights
+            weights = np.zeros(len(y))
+            weights[rng.choice(len(y), int(subset * len(y)), replace=False)] = 1
+            draws[i] = backdoor_linear_effect(y, t, W, weights)
+        elif refuter == "bootstrap_refuter":
+            # a bootstrap sample as the number of times each row is drawn
+            weights = np.bincount(rng.integers(len(y), size=len(y)), minlength=len(y))
+            draws[i] = backdoor_linear_effect(y, t, W, weights.astype(float))
+        else:
+            raise ValueError(f"Unknown refuter: {refuter}")
+    return draws
+
+
+def refute_backdoor_linear(
+    data,
+    treatment,
+    outcome,
+    common_causes,
+    refuters=REFUTERS,
+    num_simulations=100,
+    subset_fraction=0.8,
+    block_size=10,
+    seed=0,
+    max_workers=None,
+):
+    # model.refute_estimate(estimand, estimate, method_name=refuter) of DoWhy for
+    # every refuter, on the backdoor.linear_regression estimate of the CausalModel
+    # cell. The simulations are run in blocks of block_size with map_shared, so
+    # with more than one worker the rows of data without missing values are put
+    # in shared memory once and the blocks run in a process pool. The p-value is
+    # that of perform_normal_distribution_test of DoWhy: the one-tailed p-value
+    # of the estimate under a normal distribution with the mean and (ddof=0)
+    # standard deviation of the effects of the simulations. Returns a table with
+    # a row per refuter
+    common_causes = list(common_causes)
+    frame = data[[outcome, treatment] + common_causes].dropna(how="any")
+    frame = frame.astype(float)
+    estimate = backdoor_linear_effect(
+        frame[outcome].to_numpy(),
+        frame[treatment].to_numpy(),
+        frame[common_causes].to_numpy(),
+    )
+
+    sizes = [block_size] * (num_simulations // block_size)
+    if num_simulations % block_size:
+        sizes.append(num_simulations % block_size)
+    blocks = [(refuter, n) for refuter in refuters for n in sizes]
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+    tasks = [
+        (refuter, treatment, outcome, common_causes, block_seed, n, subset_fraction)
+        for (refuter, n), block_seed in zip(blocks, seeds)
+    ]
+
+    blocks = map_shared(_refutation_draws, frame, tasks, max_workers)
+
+    summary = []
+    for i, refuter in enumerate(refuters):
+        draws = np.concatenate(blocks[i * len(sizes) : (i + 1) * len(sizes)])
+        mean, std = draws.mean(), draws.std()
+        # one-tailed, on the side of the mean the estimate is on
+        p_value = stats.norm.sf(abs(estimate - mean) / std)
+        summary.append((refuter, estimate, mean, std, p_value, len(draws)))
+    summary = pd.DataFrame(
+        summary,
+        columns=[
+            "refuter",
+            "estimated_effect",
+            "new_effect",
+            "new_effect_std",
+            "p_value",
+            "simulations",
+        ],
+    )
+    return summary.set_index("refuter")
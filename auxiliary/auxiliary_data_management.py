@@ -1,131 +1,547 @@
+import glob
+import hashlib
+import os
+import shutil
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
+from pyarrow import feather
 from sklearn.decomposition import PCA
 from sklearn.impute import SimpleImputer
 
 
+## Household asset dummies - new column and the DLHS item it is coded from (1 = owns)
+_ASSET_DUMMIES = {
+    'electricity': 'hv129a',
+    'mattress': 'hv129b',
+    'cooker': 'hv129c',
+    'chair': 'hv129d',
+    'sofa': 'hv129e',
+    'bed': 'hv129f',
+    'table': 'hv129g',
+    'fan': 'hv129h',
+    'sewing': 'hv129l',
+    'computer': 'hv129o',
+    'fridge': 'hv129p',
+    'washing_machine': 'hv129q',
+    'watch': 'hv129r',
+    'bike': 'hv129s',
+    'motor_cycle': 'hv129t',
+    'animal_cart': 'hv129u',
+    'car': 'hv129v',
+    'tractor': 'hv129w',
+    'water_pump': 'hv129x',
+    'thresher': 'hv129y',
+}
+
+## District codes of the Bihar (BH) and Jharkhand (JH) districts on the state border
+# BH (District name with district codes) = Katihar = 1010, Bhagalpur= 1022, Banka = 1023, Rohtas =1032, Aurangabad = 1034, Gaya = 1035, Nawada = 1036, Jamui = 1037 *
+# JH (District name with district codes) = Garawah =2001, Palamu = 2002, Chatra= 2003, Hazaribagh = 2004, Kodarma = 2005, Giridih = 2006, Deoghar = 2007, Godda= 2008, Sahibganj = 2009, Dumka = 2011 *
+_BORDER_DISTRICTS = [
+    1010, 1022, 1023, 1032, 1034, 1035, 1036, 1037,
+    2001, 2002, 2003, 2004, 2005, 2006, 2007, 2008, 2009, 2011,
+]
+
+## Interaction terms kept in the regression frame, as the tuple of factors that are multiplied.
+## The column name is the factor names joined by "_"
+_INTERACTIONS = [
+    ##  DD Interactions
+    # Heterogeneity by Caste
+    ('treat1', 'sc'),
+    ('treat1', 'st'),
+    ('treat1', 'obc'),
+    ('female', 'sc'),
+    ('female', 'st'),
+    ('female', 'obc'),
+    ('bihar', 'sc'),
+    ('bihar', 'st'),
+    ('bihar', 'obc'),
+    # Various interactions by distance
+    ('treat1', 'longdist'),
+    ('treat2', 'longdist'),
+    ('treat3', 'longdist'),
+    ('treat4', 'longdist'),
+    ('female', 'longdist'),
+    ('bihar', 'longdist'),
+    ## DDD Interactions
+    # caste
+    ('treat1', 'bihar', 'sc'),
+    ('treat1', 'bihar', 'st'),
+    ('treat1', 'bihar', 'obc'),
+    ('treat1', 'female', 'st'),
+    ('treat1', 'female', 'obc'),
+    ('female', 'bihar', 'sc'),
+    ('female', 'bihar', 'st'),
+    ('female', 'bihar', 'obc'),
+    # DDDD Interactions
+    ('treat1', 'female', 'bihar', 'longdist'),
+    ('treat2', 'female', 'bihar', 'longdist'),
+    ('treat3', 'female', 'bihar', 'longdist'),
+    ('treat4', 'female', 'bihar', 'longdist'),
+    # DDD by caste
+    ('treat1', 'female', 'bihar', 'sc'),
+    ('treat1', 'female', 'bihar', 'st'),
+    ('treat1', 'female', 'bihar', 'obc'),
+    # DDD by Treatment Age, State and Gender
+    ('treat1', 'female', 'bihar'),
+    ('treat2', 'female', 'bihar'),
+    ('treat3', 'female', 'bihar'),
+    ('treat4', 'female', 'bihar'),
+    ('treat5', 'female', 'bihar'),
+    ('treat1', 'female'),
+    ('treat2', 'female'),
+    ('treat3', 'female'),
+    ('treat4', 'female'),
+    ('treat5', 'female'),
+    ('treat1', 'bihar'),
+    ('treat2', 'bihar'),
+    ('treat3', 'bihar'),
+    ('treat4', 'bihar'),
+    ('treat5', 'bihar'),
+    ('female', 'bihar'),
+    # Distance
+    ('treat1', 'bihar', 'longdist'),
+    ('treat2', 'bihar', 'longdist'),
+    ('treat3', 'bihar', 'longdist'),
+    ('treat4', 'bihar', 'longdist'),
+    ('treat1', 'female', 'longdist'),
+    ('treat2', 'female', 'longdist'),
+    ('treat3', 'female', 'longdist'),
+    ('treat4', 'female', 'longdist'),
+    ('female', 'bihar', 'longdist'),
+    ## Asset Index defined by "pca_asset"
+    ('treat1', 'female', 'bihar', 'pca_asset'),
+    ('female', 'bihar', 'pca_asset'),
+    ('treat1', 'bihar', 'pca_asset'),
+    ('treat1', 'pca_asset'),
+    ('female', 'pca_asset'),
+    ('bihar', 'pca_asset'),
+    ## SES Index defined by "pca_ses"
+    ('treat1', 'female', 'bihar', 'pca_ses'),
+    ('female', 'bihar', 'pca_ses'),
+    ('treat1', 'bihar', 'pca_ses'),
+    ('treat1', 'pca_ses'),
+    ('female', 'pca_ses'),
+    ('bihar', 'pca_ses'),
+    ## Muslims versus High Caste
+    ('treat1', 'female', 'bihar', 'muslim'),
+    ('female', 'bihar', 'muslim'),
+    ('treat1', 'bihar', 'muslim'),
+    ('treat1', 'muslim'),
+    ('female', 'muslim'),
+    ('bihar', 'muslim'),
+]
+
+## Interaction columns whose name does not follow their factors - these have always been built from treat2
+_RENAMED_INTERACTIONS = {
+    'treat1_female_sc': ('treat2', 'female', 'sc'),
+    'treat1_female_pca_asset': ('treat2', 'female', 'pca_asset'),
+    'treat1_female_pca_ses': ('treat2', 'female', 'pca_ses'),
+    'treat1_female_muslim': ('treat2', 'female', 'muslim'),
+}
+
+## Identifier and code columns stored as categoricals in compact mode
+_CODE_COLUMNS = ['state', 'dist', 'vpsu', 'village', 'age']
+
+## Raw DLHS columns read by gen_dlhs_reg_data - household, child and village (v1*) modules
+_DLHS_COLUMNS = [
+    'state', 'dist', 'vpsu', 'village', 'hhwt',
+    'age', 'sex', 'relationship', 'school', 'grade',
+    'hhheadmale', 'hhheadschool', 'hv115', 'hv116b',
+    'hv129a', 'hv129b', 'hv129c', 'hv129d', 'hv129e', 'hv129f', 'hv129g',
+    'hv129h', 'hv129i', 'hv129j', 'hv129k', 'hv129l', 'hv129m', 'hv129n',
+    'hv129o', 'hv129p', 'hv129q', 'hv129r', 'hv129s', 'hv129t', 'hv129u',
+    'hv129v', 'hv129w', 'hv129x', 'hv129y', 'hv130', 'hv131', 'hv134',
+    'v101a', 'v101b', 'v102', 'v110', 'v111', 'v112', 'v113',
+    'v115aa1', 'v115ba1', 'v115bb1', 'v115b2', 'v115ca1', 'v115cb1', 'v115c2',
+    'v115da1', 'v115db1', 'v115d2', 'v115ea1', 'v115eb1', 'v122a', 'v122d',
+]
+
+## Data sets read by the notebook: name -> (reader, file in original_data.zip, options).
+## "stata" is read_stata with the options, "dlhs_reg_data" is load_dlhs_reg_data
+_DATASETS = {
+    'school_dist_per': ('stata', 'schooldist.dta', {}),
+    'age_per': ('stata', 'schoolage.dta', {}),
+    'enroll_data': ('stata', 'bh_enroll_data_reg.dta', {'convert_categoricals': False}),
+    'exam_data': ('stata', 'exam_data.dta', {}),
+    'dist_data_per': ('stata', 'ddd_long.dta', {}),
+    'figure_1_oa': ('stata', 'dlhs-figure-A.1.dta', {}),
+    'regression_data': ('dlhs_reg_data', 'dlhs_long_wdist.dta', {}),
+}
+
+## Name of the index column in the feather cache written by load_dlhs_reg_data
+_CACHE_INDEX = '__index__'
+
+## Columns of the regression frame returned by gen_dlhs_reg_data, in order
+_REG_DATA_COLUMNS = [
+    'state',
+    'dist',
+    'vpsu',
+    'village',
+    'age',
+    'hhwt',
+    'hhheadmale',
+    'hhheadschool',
+    'currgrade',
+    'enrollment_secschool',
+    'enrollment_middleschool',
+    'female',
+    'bihar',
+    'sc',
+    'st',
+    'obc',
+    'highcaste',
+    'hindu',
+    'muslim',
+    'electricity',
+    'media',
+    'land',
+    'bpl',
+    'secschool',
+    'secondarydist',
+    'longdist',
+    'middle',
+    'primary',
+    'postoff',
+    'bank',
+    'towndist',
+    'hqdist',
+    'railwaydist',
+    'busdist',
+    'lcurrpop',
+    'distborder',
+    'treat1',
+    'treat2',
+    'treat3',
+    'treat4',
+    'treat5',
+    'treat1_sc',
+    'treat1_st',
+    'treat1_obc',
+    'female_sc',
+    'female_st',
+    'female_obc',
+    'bihar_sc',
+    'bihar_st',
+    'bihar_obc',
+    'treat1_longdist',
+    'treat2_longdist',
+    'treat3_longdist',
+    'treat4_longdist',
+    'female_longdist',
+    'bihar_longdist',
+    'treat1_bihar_sc',
+    'treat1_bihar_st',
+    'treat1_bihar_obc',
+    'treat1_female_sc',
+    'treat1_female_st',
+    'treat1_female_obc',
+    'female_bihar_sc',
+    'female_bihar_st',
+    'female_bihar_obc',
+    'treat1_female_bihar_longdist',
+    'treat2_female_bihar_longdist',
+    'treat3_female_bihar_longdist',
+    'treat4_female_bihar_longdist',
+    'treat1_female_bihar_sc',
+    'treat1_female_bihar_st',
+    'treat1_female_bihar_obc',
+    'treat1_female_bihar',
+    'treat2_female_bihar',
+    'treat3_female_bihar',
+    'treat4_female_bihar',
+    'treat5_female_bihar',
+    'treat1_female',
+    'treat2_female',
+    'treat3_female',
+    'treat4_female',
+    'treat5_female',
+    'treat1_bihar',
+    'treat2_bihar',
+    'treat3_bihar',
+    'treat4_bihar',
+    'treat5_bihar',
+    'female_bihar',
+    'treat1_bihar_longdist',
+    'treat2_bihar_longdist',
+    'treat3_bihar_longdist',
+    'treat4_bihar_longdist',
+    'treat1_female_longdist',
+    'treat2_female_longdist',
+    'treat3_female_longdist',
+    'treat4_female_longdist',
+    'female_bihar_longdist',
+    'pca_asset',
+    'pca_ses',
+    'treat1_female_bihar_pca_asset',
+    'treat1_female_pca_asset',
+    'female_bihar_pca_asset',
+    'treat1_bihar_pca_asset',
+    'treat1_pca_asset',
+    'female_pca_asset',
+    'bihar_pca_asset',
+    'treat1_female_bihar_pca_ses',
+    'treat1_female_pca_ses',
+    'female_bihar_pca_ses',
+    'treat1_bihar_pca_ses',
+    'treat1_pca_ses',
+    'female_pca_ses',
+    'bihar_pca_ses',
+    'treat1_female_bihar_muslim',
+    'treat1_female_muslim',
+    'female_bihar_muslim',
+    'treat1_bihar_muslim',
+    'treat1_muslim',
+    'female_muslim',
+    'bihar_muslim',
+]
+
+
+def _gen_dummy(column, values):
+    return column.isin(values).astype(int)
+
+def _gen_any_dummy(df, columns):
+    return df[columns].eq(1).any(axis=1).astype(int)
+
 def _generate_secondary_dist(df):
-    if df["v115ca1"] == 1 or df["v115cb1"] == 1:
-        return 0
-    else:
-        return df["v115c2"]
+    in_village = (df["v115ca1"] == 1) | (df["v115cb1"] == 1)
+    return np.where(in_village, 0, df["v115c2"]).astype(float)
 
 def _generate_middle_dist(df):
-    if df["v115ba1"] == 1 or df["v115bb1"] == 1:
-        return 0
-    else:
-        return df["v115b2"]
+    in_village = (df["v115ba1"] == 1) | (df["v115bb1"] == 1)
+    return np.where(in_village, 0, df["v115b2"]).astype(float)
+
+def _generate_high_secondary_dist(df):
+    in_village = (df["v115da1"] == 1) | (df["v115db1"] == 1)
+    return np.where(in_village, 0, df["v115d2"]).astype(float)
 
 def _gen_bpl(hv134):
-    if hv134 == 1:
-        return 1
-    elif hv134 == 2:
-        return 0
-    else:
-        return np.nan
+    return np.select([hv134 == 1, hv134 == 2], [1, 0], default=np.nan)
 
 def _gen_treat(age, treatment, control):
-    if age in treatment:
-        return 1
-    elif age in control:
-        return 0
-    else:
-        return np.nan    
+    return np.select([age.isin(treatment), age.isin(control)], [1, 0], default=np.nan)
+
+def _interaction_specs(interactions):
+    if isinstance(interactions, dict):
+        return dict(interactions)
+    return {'_'.join(factors): tuple(factors) for factors in interactions}
+
+def gen_interactions(df, interactions):
+    """
+    Multiplies the requested factor columns of df in one pass over a stacked
+    float block. interactions is a list of factor tuples (named by joining the
+    factors with "_") or a dict of column name -> factor tuple. Products of
+    integer factors are returned as int, everything else as float.
+    """
+    specs = _interaction_specs(interactions)
+    factors = list(dict.fromkeys(f for spec in specs.values() for f in spec))
+    df = expand_dtypes(df[factors])
+    # one row per factor, the trailing row of ones pads shorter tuples to the longest one
+    block = np.ones((len(factors) + 1, len(df)))
+    block[:-1] = df[factors].to_numpy(dtype=float).T
+    width = max((len(spec) for spec in specs.values()), default=1)
+    positions = np.full((len(specs), width), len(factors))
+    for row, spec in enumerate(specs.values()):
+        positions[row, : len(spec)] = [factors.index(f) for f in spec]
+    products = block[positions[:, 0]]
+    for column in range(1, width):
+        products *= block[positions[:, column]]
+
+    interaction_df = pd.DataFrame(products.T, index=df.index, columns=list(specs))
+    integer_columns = [
+        name for name, spec in specs.items()
+        if all(pd.api.types.is_integer_dtype(df[f]) for f in spec)
+    ]
+    interaction_df[integer_columns] = interaction_df[integer_columns].astype(int)
+    return interaction_df
+
+def _smallest_nullable_int(values):
+    for dtype in ['Int8', 'Int16', 'Int32']:
+        info = np.iinfo(dtype.lower())
+        if values.empty or (values.min() >= info.min and values.max() <= info.max):
+            return dtype
+    return None
+
+def compact_dtypes(df, codes=_CODE_COLUMNS):
+    """
+    Shrinks the regression frame: 0/1 integer dummies become bool, float columns
+    holding whole numbers (the treat* family and its interactions, where NaN
+    marks "neither treatment nor control", grades and rounded distances) become
+    the smallest nullable integer dtype, i.e. small ints with a separate
+    validity mask, and code columns become categoricals. expand_dtypes reverses
+    the conversion exactly.
+    """
+    dtypes = {}
+    for column in df.columns:
+        values = df[column]
+        if column in codes:
+            dtypes[column] = 'category'
+        elif pd.api.types.is_integer_dtype(values) and values.isin([0, 1]).all():
+            dtypes[column] = bool
+        elif pd.api.types.is_float_dtype(values):
+            valid = values.dropna()
+            if np.array_equal(valid, np.round(valid)):
+                dtype = _smallest_nullable_int(valid)
+                if dtype is not None:
+                    dtypes[column] = dtype
+    return df.astype(dtypes)
+
+def expand_dtypes(df):
+    """
+    Up-casts the columns shrunk by compact_dtypes back to the int64/float64
+    dtypes gen_dlhs_reg_data returns by default, so the frame can be used to
+    build a design matrix.
+    """
+    dtypes = {}
+    for column in df.columns:
+        dtype = df[column].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            categories = dtype.categories.dtype
+            dtypes[column] = float if df[column].isna().any() else categories
+        elif pd.api.types.is_bool_dtype(dtype):
+            dtypes[column] = int
+        elif isinstance(dtype, pd.api.extensions.ExtensionDtype) and dtype.kind in 'iu':
+            dtypes[column] = float
+    return df.astype(dtypes) if dtypes else df
+
+
+class RegressionFrame:
+    """
+    Regression frame whose interaction columns are only computed the first time
+    they are requested, and kept afterwards. Column access follows a DataFrame:
+    frame["col"] returns a Series, frame[[...]] and frame.loc[rows, [...]] return
+    DataFrames, so it can be passed to the table functions in place of the
+    output of gen_dlhs_reg_data. to_frame() materializes every column.
+    """
+
+    def __init__(self, base, interactions, columns=None, compact=False):
+        self._base = base
+        self._interactions = _interaction_specs(interactions)
+        self._compact = compact
+        self._computed = {}
+        if columns is None:
+            columns = list(base.columns) + list(self._interactions)
+        self.columns = pd.Index(columns)
+
+    @property
+    def index(self):
+        return self._base.index
+
+    @property
+    def shape(self):
+        return (len(self._base), len(self.columns))
+
+    @property
+    def loc(self):
+        return _RegressionFrameLocIndexer(self)
+
+    def __len__(self):
+        return len(self._base)
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    def _compute(self, columns):
+        missing = [
+            c for c in dict.fromkeys(columns)
+            if c in self._interactions and c not in self._computed
+        ]
+        if missing:
+            specs = {c: self._interactions[c] for c in missing}
+            computed = gen_interactions(self._base, specs)
+            if self._compact:
+                computed = compact_dtypes(computed)
+            self._computed.update(computed.items())
+
+    def _column(self, column):
+        if column in self._interactions:
+            return self._computed[column]
+        return self._base[column]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self.columns:
+                raise KeyError(key)
+            self._compute([key])
+            return self._column(key)
+        columns = list(key)
+        unknown = [c for c in columns if c not in self.columns]
+        if unknown:
+            raise KeyError(f"{unknown} not in regression frame")
+        self._compute(columns)
+        return pd.DataFrame(
+            {c: self._column(c).array for c in columns}, index=self.index
+        )[columns]
+
+    def to_frame(self):
+        return self[list(self.columns)]
+
+    def copy(self):
+        return self.to_frame()
+
+
+class _RegressionFrameLocIndexer:
+    def __init__(self, frame):
+        self._frame = frame
+
+    def __getitem__(self, key):
+        rows, columns = key if isinstance(key, tuple) else (key, slice(None))
+        if isinstance(columns, slice):
+            df = self._frame.to_frame()
+        elif isinstance(columns, str):
+            df = self._frame[[columns]]
+        else:
+            df = self._frame[columns]
+        return df.loc[rows, columns]
+    
     
 
  
-def gen_dlhs_reg_data(dlhs_long_wdist):
+def gen_dlhs_reg_data(dlhs_long_wdist, lazy=False, compact=False):
     df = dlhs_long_wdist.copy()
-    df = df.loc[(df['state'] == 10)| (df['state'] ==20)]
-    df['inschool'] = df['school'].apply(lambda x: 1 if x==1 else 0)
-    df['currgrade'] = df.apply(lambda x: x['grade'] + 1 if x['inschool'] == 1 else np.nan, axis=1)
-    df['enrollment_secschool'] = df.apply(lambda x: 1 if x['currgrade'] == 9 or x['grade'] >= 9 else 0, axis=1)
-    df['enrollment_middleschool'] = df.apply(lambda x: 1 if x['currgrade'] == 8 or x['grade'] >= 8 else 0, axis=1)
+    df = df.loc[(df['state'] == 10)| (df['state'] ==20)].copy()
+    df['inschool'] = _gen_dummy(df['school'], [1])
+    df['currgrade'] = np.where(df['inschool'] == 1, df['grade'] + 1, np.nan)
+    df['enrollment_secschool'] = ((df['currgrade'] == 9) | (df['grade'] >= 9)).astype(int)
+    df['enrollment_middleschool'] = ((df['currgrade'] == 8) | (df['grade'] >= 8)).astype(int)
     # Create dummies 
     
     ## Female dummy
-    df['female'] = df['sex'].apply(lambda x: 1 if x == 2 else 0)
+    df['female'] = _gen_dummy(df['sex'], [2])
     ## Bihar/Jharkhand dummy
-    df['bihar'] = df['state'].apply(lambda x: 1 if x == 10 else 0)
+    df['bihar'] = _gen_dummy(df['state'], [10])
     ## Relationship Indicator 
-    df['child_sample'] = df['relationship'].apply(lambda x: 1 if x in [3, 5, 8, 10]  else 0)
+    df['child_sample'] = _gen_dummy(df['relationship'], [3, 5, 8, 10])
     ## Scheduled caste/scheduled tribe
-    df['sc'] = df['hv116b'].apply(lambda x: 1 if x == 1 else 0)
-    df['st'] = df['hv116b'].apply(lambda x: 1 if x == 2 else 0)
-    df['obc'] = df['hv116b'].apply(lambda x: 1 if x == 3 else 0)
-    df['highcaste'] = df['hv116b'].apply(lambda x: 1 if x==4 else 0)
-    df['scst'] = df['hv116b'].apply(lambda x: 1 if x in [1, 2] else 0)
+    df['sc'] = _gen_dummy(df['hv116b'], [1])
+    df['st'] = _gen_dummy(df['hv116b'], [2])
+    df['obc'] = _gen_dummy(df['hv116b'], [3])
+    df['highcaste'] = _gen_dummy(df['hv116b'], [4])
+    df['scst'] = _gen_dummy(df['hv116b'], [1, 2])
     ## Dummy for Religion, hindu , muslim and others 
-    df['hindu'] = df['hv115'].apply(lambda x: 1 if x == 1 else 0)
-    df['muslim'] = df['hv115'].apply(lambda x: 1 if x == 2 else 0)
-    df['other'] = df['hv115'].apply(lambda x: 1 if x > 2 else 0)
-    ## Generate electricity dummy 
-    df['electricity'] = df['hv129a'].apply(lambda x: 1 if x == 1 else 0)
-    df['mattress'] = df['hv129b'].apply(lambda x: 1 if x == 1 else 0)
-    df['cooker'] = df['hv129c'].apply(lambda x: 1 if x == 1 else 0)
-    df['chair'] = df['hv129d'].apply(lambda x: 1 if x == 1 else 0)
-    df['sofa'] = df['hv129e'].apply(lambda x: 1 if x == 1 else 0)
-    df['bed'] = df['hv129f'].apply(lambda x: 1 if x == 1 else 0)
-    df['table'] = df['hv129g'].apply(lambda x: 1 if x == 1 else 0)
-    df['fan'] = df['hv129h'].apply(lambda x: 1 if x == 1 else 0)
-    df['sewing'] = df['hv129l'].apply(lambda x: 1 if x == 1 else 0)
-    df['phone'] = df.apply(lambda x: 1 if x['hv129m'] == 1 or x['hv129n'] == 1 else 0, axis=1)
-    df['computer'] = df['hv129o'].apply(lambda x: 1 if x == 1 else 0)
-    df['fridge'] = df['hv129p'].apply(lambda x: 1 if x == 1 else 0)
-    df['washing_machine'] = df['hv129q'].apply(lambda x: 1 if x == 1 else 0)
-    df['watch'] = df['hv129r'].apply(lambda x: 1 if x == 1 else 0)
-    df['motor_cycle'] = df['hv129t'].apply(lambda x: 1 if x == 1 else 0)
-    df['animal_cart'] = df['hv129u'].apply(lambda x: 1 if x == 1 else 0)
-    df['car'] = df['hv129v'].apply(lambda x: 1 if x == 1 else 0)
-    df['tractor'] = df['hv129w'].apply(lambda x: 1 if x == 1 else 0)
-    df['water_pump'] = df['hv129x'].apply(lambda x: 1 if x == 1 else 0)
-    df['thresher'] = df['hv129y'].apply(lambda x: 1 if x == 1 else 0)
-    ## Bike ownership
-    df['bike'] = df['hv129s'].apply(lambda x: 1 if x == 1 else 0)
-    ## Ownership of radio/tv - idea= access to govt schemes
-    df['media'] = df.apply(lambda x: 1 if x['hv129i'] == 1 or x['hv129j'] == 1 or x['hv129k'] == 1 else 0, axis=1)
-    ## Indicator for poor farmers having less than 5 acres of land 
-    df['land'] = df.apply(lambda x: 1 if x['hv130'] == 2 or x['hv131'] < 5 else 0, axis = 1)
-    ## Owns BPL card
-    df['bpl'] = df['hv134'].apply(lambda x: 1 if x == 1 else 0)
-    ## Generate electricity dummy 
-    df['electricity'] = df['hv129a'].apply(lambda x: 1 if x == 1 else 0)
-    df['mattress'] = df['hv129b'].apply(lambda x: 1 if x == 1 else 0)
-    df['cooker'] = df['hv129c'].apply(lambda x: 1 if x == 1 else 0)
-    df['chair'] = df['hv129d'].apply(lambda x: 1 if x == 1 else 0)
-    df['sofa'] = df['hv129e'].apply(lambda x: 1 if x == 1 else 0)
-    df['bed'] = df['hv129f'].apply(lambda x: 1 if x == 1 else 0)
-    df['table'] = df['hv129g'].apply(lambda x: 1 if x == 1 else 0)
-    df['fan'] = df['hv129h'].apply(lambda x: 1 if x == 1 else 0)
-    df['sewing'] = df['hv129l'].apply(lambda x: 1 if x == 1 else 0)
-    df['phone'] = df.apply(lambda x: 1 if x['hv129m'] == 1 or x ['hv129n'] else 0, axis 
-    = 1)
-    df['computer'] = df['hv129o'].apply(lambda x: 1 if x == 1 else 0)
-    df['fridge'] = df['hv129p'].apply(lambda x: 1 if x == 1 else 0)
-    df['washing_machine'] = df['hv129q'].apply(lambda x: 1 if x == 1 else 0)
-    df['watch'] = df['hv129r'].apply(lambda x: 1 if x == 1 else 0)
-    df['motor_cycle'] = df['hv129t'].apply(lambda x: 1 if x == 1 else 0)
-    df['animal_cart'] = df['hv129u'].apply(lambda x: 1 if x == 1 else 0)
-    df['car'] = df['hv129v'].apply(lambda x: 1 if x == 1 else 0)
-    df['tractor'] = df['hv129w'].apply(lambda x: 1 if x == 1 else 0)
-    df['water_pump'] = df['hv129x'].apply(lambda x: 1 if x == 1 else 0)
-    df['thresher'] = df['hv129y'].apply(lambda x: 1 if x == 1 else 0)
-    ## Bike ownership
-    df['bike'] = df['hv129s'].apply(lambda x: 1 if x == 1 else 0)
+    df['hindu'] = _gen_dummy(df['hv115'], [1])
+    df['muslim'] = _gen_dummy(df['hv115'], [2])
+    df['other'] = (df['hv115'] > 2).astype(int)
+    ## Generate electricity and other asset dummies
+    for name, column in _ASSET_DUMMIES.items():
+        df[name] = _gen_dummy(df[column], [1])
+    ## Phone ownership - a missing mobile phone answer counts as owning one, as in the DLHS coding used so far
+    df['phone'] = ((df['hv129m'] == 1) | (df['hv129n'] != 0)).astype(int)
     ## Ownership of radio/tv - idea= access to govt schemes
-    df['media'] = df.apply(lambda x: 1 if x['hv129i'] == 1 or x['hv129j'] == 1 or 
-    x['hv129k'] == 1 else 0, axis=1)
+    df['media'] = _gen_any_dummy(df, ['hv129i', 'hv129j', 'hv129k'])
     ## Indicator for poor farmers having less than 5 acres of land 
-    df['land'] = df.apply(lambda x: 1 if x['hv130'] == 2 or x['hv131'] == 1 else 0, axis = 1)
+    df['land'] = ((df['hv130'] == 2) | (df['hv131'] == 1)).astype(int)
     ## Owns BPL card
-    df['bpl'] = df['hv134'].apply(_gen_bpl)
+    df['bpl'] = _gen_bpl(df['hv134'])
     ## Creating Distance to School Variables
     ## Create indicator variable - if secondary school is present in the village 
-    df['secschool'] = df['v115ca1'].apply(lambda x: 1 if x == 1 else 0)
-    df['secondarydist'] = df.apply(_generate_secondary_dist, axis=1)
-    df['longdist'] = df['secondarydist'].apply(lambda x: 1 if x > 3 else 0)
-    df['secondarydistq'] = df['secondarydist'].apply(lambda x: x ** 2)
-    df['highsecondarydist'] = df.apply(lambda x: 0 if x['v115da1'] == 1 or x['v115db1'] == 1 else x['v115d2'], axis = 1)
+    df['secschool'] = _gen_dummy(df['v115ca1'], [1])
+    df['secondarydist'] = _generate_secondary_dist(df)
+    df['longdist'] = (df['secondarydist'] > 3).astype(int)
+    df['secondarydistq'] = df['secondarydist'] ** 2
+    df['highsecondarydist'] = _generate_high_secondary_dist(df)
     ## Drop some weird observations - missing distances etc 
     df = df.round({'secondarydist': 0, 'highsecondarydist': 0})
     df.drop(df.loc[df['secondarydist'] == 99.].index, inplace=True)
@@ -134,20 +550,20 @@ def gen_dlhs_reg_data(dlhs_long_wdist):
     df['lsecondarydist'] = np.log(df['secondarydist'])
     ## Access to middle school (govt)- omitted variable, it is possible that a kid wont 
     # go to secondary school and up if there is no middle school in the village
-    df['middle'] = df['v115bb1'].apply(lambda x: 1 if x == 1  else 0)
+    df['middle'] = _gen_dummy(df['v115bb1'], [1])
     ## Create the distance variable to the nearest middle school 
-    df['middledist'] = df.apply(_generate_middle_dist, axis=1)
+    df['middledist'] = _generate_middle_dist(df)
         ## Create indicator variable- if primary school is present in the village
-    df['primary'] = df['v115aa1'].apply(lambda x: 1 if x == 1 else 0)
+    df['primary'] = _gen_dummy(df['v115aa1'], [1])
         ## Create the distance variable to the nearest primary school
-    df['primarydist'] = df.apply(lambda x: 0 if x['v115aa1'] == 1 or x['v115ab1'] == 1 else 0, axis = 1)
+    df['primarydist'] = 0
     ## Access to college- controlling as this could change incentives in a way that might bias the estimates upwards
-    df['pubcollege'] = df['v115ea1'].apply(lambda x: 1 if x == 1 else 0)
-    df['pvtcollege'] = df['v115eb1'].apply(lambda x: 1 if x == 1 else 0)
-    df['college'] = df.apply(lambda x: 1 if x['pubcollege'] == 1 or x ['pvtcollege'] else 0, axis = 1)
+    df['pubcollege'] = _gen_dummy(df['v115ea1'], [1])
+    df['pvtcollege'] = _gen_dummy(df['v115eb1'], [1])
+    df['college'] = _gen_any_dummy(df, ['pubcollege', 'pvtcollege'])
     ## Create variables - facilities available in the village
-    df['postoff'] = df['v122a'].apply(lambda x: 1 if x == 1 else 0)
-    df['bank'] = df['v122d'].apply(lambda x: 1 if x == 1 else 0)
+    df['postoff'] = _gen_dummy(df['v122a'], [1])
+    df['bank'] = _gen_dummy(df['v122d'], [1])
     ## Create distance to local facilities by village
     df['towndist'] = df['v110']
     df['hqdist'] = df['v111']
@@ -155,13 +571,13 @@ def gen_dlhs_reg_data(dlhs_long_wdist):
     df['busdist'] = df['v113']
         ## Long Distance to different centers
         # Railway station 
-    df['longraildist'] = df['railwaydist'].apply(lambda x: 1 if x > 3 else 0)
+    df['longraildist'] = (df['railwaydist'] > 3).astype(int)
     # Bus distance
-    df['longbusdist'] = df['busdist'].apply(lambda x: 1 if x > 3 else 0)
+    df['longbusdist'] = (df['busdist'] > 3).astype(int)
     # Distance to district Headquarter
-    df['longhqdist'] = df['hqdist'].apply(lambda x: 1 if x > 3 else 0)
+    df['longhqdist'] = (df['hqdist'] > 3).astype(int)
     # Distance to nearest town
-    df['longtowndist'] = df['towndist'].apply(lambda x: 1 if x > 3 else 0)
+    df['longtowndist'] = (df['towndist'] > 3).astype(int)
     ## Create population measures
     df['censuspop'] = df['v101a']
     df['lcensuspop'] = np.log(df['censuspop'])
@@ -170,176 +586,21 @@ def gen_dlhs_reg_data(dlhs_long_wdist):
         ## Create no. of hh in the village
     df['tothhvill'] = df['v102']
         ## Creating district borders - Bihar (BH) and Jharkhand (JH)
-        # BH (District name with district codes) = Katihar = 1010, Bhagalpur= 1022, Banka = 1023, Rohtas =1032, Aurangabad = 1034, Gaya = 1035, Nawada = 1036, Jamui = 1037 *
-        # JH (District name with district codes) = Garawah =2001, Palamu = 2002, Chatra= 2003, Hazaribagh = 2004, Kodarma = 2005, Giridih = 2006, Deoghar = 2007, Godda= 2008, Sahibganj = 2009, Dumka = 2011 *
-    df['distborder'] = df['dist'].apply(lambda x: 1 if x == 1010 or x == 1022 or x == 1023 or x == 1032 or x == 1034 or
-    x == 1035 or x == 1036 or x == 1037 or x == 2001 or x == 2002 or x == 2003 or x == 2004 or x == 2005 or x == 2006
-    or x == 2007 or x == 2008 or x == 2009 or x == 2011 else 0)
+    df['distborder'] = _gen_dummy(df['dist'], _BORDER_DISTRICTS)
     ## Generating various treatments and controls
     # Treatment 1 = treat1 = is 14/15 years old, control is 16/17 years old. This is the main treatment variable
 
 
 
 
-    df['treat1'] = df['age'].apply(_gen_treat, args=([14, 15], [16, 17]))
-    df['treat2'] = df['age'].apply(_gen_treat, args=([13, 14, 15], [16, 17]))
+    df['treat1'] = _gen_treat(df['age'], [14, 15], [16, 17])
+    df['treat2'] = _gen_treat(df['age'], [13, 14, 15], [16, 17])
     # Treatment 3= treat3 = is 14/15 years old, control is 16 years old
-    df['treat3'] = df['age'].apply(_gen_treat, args=([14, 15], [16]))
+    df['treat3'] = _gen_treat(df['age'], [14, 15], [16])
     # Treatment 4 = treat4 = is 13/14/15 years old, control is 16 years old
-    df['treat4'] = df['age'].apply(_gen_treat, args=([13, 14, 15], [16]))
+    df['treat4'] = _gen_treat(df['age'], [13, 14, 15], [16])
     # Treatment 5 = treat5 = is 13/14 years old, control is 15/16 years old. This is for girls in grade 8 
-    df['treat5'] = df['age'].apply(_gen_treat, args=([13, 14], [15, 16]))
-    ## Various Interactions needed to perform DD, DDD, DDDD Analysis
-    #  DD Interactions 
-    # Heterogeneity by Caste
-    df['treat1_scst'] = df['treat1'] * df['scst']
-    df['treat1_sc'] = df['treat1'] * df['sc']
-    df['treat1_st'] = df['treat1'] * df['st']
-    df['treat1_obc'] = df['treat1'] * df['obc']
-    df['treat1_obc'] = df['treat1'] * df['obc']
-
-    df['treat2_scst'] = df['treat2'] * df['scst']
-    df['treat2_sc'] = df['treat2'] * df['sc']
-    df['treat2_st'] = df['treat2'] * df['st']
-    df['treat2_obc'] = df['treat2'] * df['obc']
-
-    df['treat3_scst'] = df['treat3'] * df['scst']
-    df['treat3_sc'] = df['treat3'] * df['sc']
-    df['treat3_st'] = df['treat3'] * df['st']
-    df['treat3_obc'] = df['treat3'] * df['obc']
-
-    df['treat4_scst'] = df['treat4'] * df['scst']
-    df['treat4_sc'] = df['treat4'] * df['sc']
-    df['treat4_st'] = df['treat4'] * df['st']
-    df['treat4_obc'] = df['treat4'] * df['obc']
-
-    df['treat5_scst'] = df['treat5'] * df['scst']
-    df['treat5_sc'] = df['treat5'] * df['sc']
-    df['treat5_st'] = df['treat5'] * df['st']
-    df['treat5_obc'] = df['treat5'] * df['obc']
-
-    df['female_sc'] = df['female'] * df['sc']
-    df['female_st'] = df['female'] * df['st']
-    df['female_obc'] = df['female'] * df['obc']
-
-    df['bihar_sc'] = df['bihar'] * df['sc']
-    df['bihar_st'] = df['bihar'] * df['st']
-    df['bihar_obc'] = df['bihar'] * df['obc']
-
-        ## Various interactions by distance
-    df['treat1_longdist'] = df['treat1'] * df['longdist']
-    df['treat2_longdist'] = df['treat2'] * df['longdist']
-    df['treat3_longdist'] = df['treat3'] * df['longdist']
-    df['treat4_longdist'] = df['treat4'] * df['longdist']
-    df['treat5_longdist'] = df['treat5'] * df['longdist']
-    df['female_longdist'] = df['female'] * df['longdist']
-    df['bihar_longdist'] = df['bihar'] * df['longdist']
-
-        ##DDD Interactions 
-        # caste 
-    df['treat1_bihar_sc'] = df['treat1'] * df['bihar'] * df['sc']
-    df['treat2_bihar_sc'] = df['treat2'] * df['bihar'] * df['sc']
-    df['treat3_bihar_sc'] = df['treat3'] * df['bihar'] * df['sc']
-    df['treat4_bihar_sc'] = df['treat4'] * df['bihar'] * df['sc']
-    df['treat5_bihar_sc'] = df['treat5'] * df['bihar'] * df['sc']
-
-    df['treat1_bihar_st'] = df['treat1'] * df['bihar'] * df['st']
-    df['treat2_bihar_st'] = df['treat2'] * df['bihar'] * df['st']
-    df['treat3_bihar_st'] = df['treat3'] * df['bihar'] * df['st']
-    df['treat4_bihar_st'] = df['treat4'] * df['bihar'] * df['st']
-    df['treat5_bihar_st'] = df['treat5'] * df['bihar'] * df['st']
-
-    df['treat1_bihar_obc'] = df['treat1'] * df['bihar'] * df['obc']
-    df['treat2_bihar_obc'] = df['treat2'] * df['bihar'] * df['obc']
-    df['treat3_bihar_obc'] = df['treat3'] * df['bihar'] * df['obc']
-    df['treat4_bihar_obc'] = df['treat4'] * df['bihar'] * df['obc']
-    df['treat5_bihar_obc'] = df['treat5'] * df['bihar'] * df['obc']
-
-    df['treat1_female_sc'] = df['treat1'] * df['female'] * df['sc']
-    df['treat1_female_sc'] = df['treat2'] * df['female'] * df['sc']
-    df['treat3_female_sc'] = df['treat3'] * df['female'] * df['sc']
-    df['treat4_female_sc'] = df['treat4'] * df['female'] * df['sc']
-    df['treat5_female_sc'] = df['treat5'] * df['female'] * df['sc']
-
-    df['treat1_female_st'] = df['treat1'] * df['female'] * df['st']
-    df['treat2_female_st'] = df['treat2'] * df['female'] * df['st']
-    df['treat3_female_st'] = df['treat3'] * df['female'] * df['st']
-    df['treat4_female_st'] = df['treat4'] * df['female'] * df['st']
-    df['treat5_female_st'] = df['treat5'] * df['female'] * df['st']
-
-    df['treat1_female_obc'] = df['treat1'] * df['female'] * df['obc']
-    df['treat2_female_obc'] = df['treat2'] * df['female'] * df['obc']
-    df['treat3_female_obc'] = df['treat3'] * df['female'] * df['obc']
-    df['treat4_female_obc'] = df['treat4'] * df['female'] * df['obc']
-    df['treat5_female_obc'] = df['treat5'] * df['female'] * df['obc']
-
-    df['female_bihar_sc'] = df['female'] * df['bihar'] * df['sc']
-    df['female_bihar_st'] = df['female'] * df['bihar'] * df['st']
-    df['female_bihar_obc'] = df['female'] * df['bihar'] * df['obc']
-
-        # DDDD Interactions 
-    df['treat1_female_bihar_longdist'] = df['treat1'] * df['female'] * df['bihar'] * df['longdist']
-    df['treat2_female_bihar_longdist'] = df['treat2'] * df['female'] * df['bihar'] * df['longdist']
-    df['treat3_female_bihar_longdist'] = df['treat3'] * df['female'] * df['bihar'] * df['longdist']
-    df['treat4_female_bihar_longdist'] = df['treat4'] * df['female'] * df['bihar'] * df['longdist']
-    df['treat5_female_bihar_longdist'] = df['treat5'] * df['female'] * df['bihar'] * df['longdist']
-
-        # DDD by caste 
-    df['treat1_female_bihar_sc'] = df['treat1'] * df['female'] * df['bihar'] * df['sc']
-    df['treat2_female_bihar_sc'] = df['treat2'] * df['female'] * df['bihar'] * df['sc']
-    df['treat3_female_bihar_sc'] = df['treat3'] * df['female'] * df['bihar'] * df['sc']
-    df['treat4_female_bihar_sc'] = df['treat4'] * df['female'] * df['bihar'] * df['sc']
-    df['treat5_female_bihar_sc'] = df['treat5'] * df['female'] * df['bihar'] * df['sc']
-
-    df['treat1_female_bihar_st'] = df['treat1'] * df['female'] * df['bihar'] * df['st']
-    df['treat2_female_bihar_st'] = df['treat2'] * df['female'] * df['bihar'] * df['st']
-    df['treat3_female_bihar_st'] = df['treat3'] * df['female'] * df['bihar'] * df['st']
-    df['treat4_female_bihar_st'] = df['treat4'] * df['female'] * df['bihar'] * df['st']
-    df['treat5_female_bihar_st'] = df['treat5'] * df['female'] * df['bihar'] * df['st']
-
-    df['treat1_female_bihar_obc'] = df['treat1'] * df['female'] * df['bihar'] * df['obc']
-    df['treat2_female_bihar_obc'] = df['treat2'] * df['female'] * df['bihar'] * df['obc']
-    df['treat3_female_bihar_obc'] = df['treat3'] * df['female'] * df['bihar'] * df['obc']
-    df['treat4_female_bihar_obc'] = df['treat4'] * df['female'] * df['bihar'] * df['obc']
-    df['treat5_female_bihar_obc'] = df['treat5'] * df['female'] * df['bihar'] * df['obc']
-
-        #DDD by Treatment Age, State and Gender 
-    df['treat1_female_bihar'] = df['treat1'] * df['female'] * df['bihar']
-    df['treat2_female_bihar'] = df['treat2'] * df['female'] * df['bihar']
-    df['treat3_female_bihar'] = df['treat3'] * df['female'] * df['bihar']
-    df['treat4_female_bihar'] = df['treat4'] * df['female'] * df['bihar']
-    df['treat5_female_bihar'] = df['treat5'] * df['female'] * df['bihar']
-
-    df['treat1_female'] = df['treat1'] * df['female'] 
-    df['treat2_female'] = df['treat2'] * df['female'] 
-    df['treat3_female'] = df['treat3'] * df['female'] 
-    df['treat4_female'] = df['treat4'] * df['female'] 
-    df['treat5_female'] = df['treat5'] * df['female'] 
-
-    df['treat1_bihar'] = df['treat1'] * df['bihar'] 
-    df['treat2_bihar'] = df['treat2'] * df['bihar'] 
-    df['treat3_bihar'] = df['treat3'] * df['bihar'] 
-    df['treat4_bihar'] = df['treat4'] * df['bihar'] 
-    df['treat5_bihar'] = df['treat5'] * df['bihar'] 
-
-    df['female_bihar'] = df['female'] * df['bihar'] 
-
-        # Distance
-
-    df['treat1_bihar_longdist'] = df['treat1'] * df['bihar'] * df['longdist']
-    df['treat2_bihar_longdist'] = df['treat2'] * df['bihar'] * df['longdist']
-    df['treat3_bihar_longdist'] = df['treat3'] * df['bihar'] * df['longdist']
-    df['treat4_bihar_longdist'] = df['treat4'] * df['bihar'] * df['longdist']
-    df['treat5_bihar_longdist'] = df['treat5'] * df['bihar'] * df['longdist']
-
-    df['treat1_female_longdist'] = df['treat1'] * df['female'] * df['longdist']
-    df['treat2_female_longdist'] = df['treat2'] * df['female'] * df['longdist']
-    df['treat3_female_longdist'] = df['treat3'] * df['female'] * df['longdist']
-    df['treat4_female_longdist'] = df['treat4'] * df['female'] * df['longdist']
-    df['treat5_female_longdist'] = df['treat5'] * df['female'] * df['longdist']
-
-    df['female_bihar_longdist'] = df['female'] * df['bihar'] * df['longdist']
-
+    df['treat5'] = _gen_treat(df['age'], [13, 14], [15, 16])
         # Creating Asset Index using PCA - Land, Poverty Status, Access to Radio/TV, and Electricity
     
     pca_asset_cols = df.loc[:, ['land', 'bpl', 'media', 'electricity']]
@@ -352,162 +613,267 @@ def gen_dlhs_reg_data(dlhs_long_wdist):
 
     df['pca_ses'] = PCA(n_components=1).fit_transform(SimpleImputer(missing_values=np.nan, strategy='mean').fit_transform(pcs_socioeconomic_cols)).T[0]
 
-        ## With Asset Index defined by "pca_asset" 
-    #     #  Generating Interactions for Asset Index 
-    df['treat1_female_bihar_pca_asset'] = df['treat1'] * df['female'] * df['bihar'] * df['pca_asset']
-    df['treat1_female_pca_asset'] = df['treat2'] * df['female'] * df['pca_asset']
-    df['female_bihar_pca_asset'] = df['female'] * df['bihar'] * df['pca_asset']
-    df['treat1_bihar_pca_asset'] = df['treat1'] * df['bihar'] * df['pca_asset']
-    df['treat1_pca_asset'] = df['treat1'] * df['pca_asset'] 
-    df['female_pca_asset'] = df['female'] * df['pca_asset']
-    df['bihar_pca_asset'] = df['bihar'] * df['pca_asset']
-
-    #     ## With Asset Index defined by "pca_ses"
-    #     # Generating Interactions for SES Index
-    df['treat1_female_bihar_pca_ses'] = df['treat1'] * df['female'] * df['bihar'] * df['pca_ses']
-    df['treat1_female_pca_ses'] = df['treat2'] * df['female'] * df['pca_ses']
-    df['female_bihar_pca_ses'] = df['female'] * df['bihar'] * df['pca_ses']
-    df['treat1_bihar_pca_ses'] = df['treat1'] * df['bihar'] * df['pca_ses']
-    df['treat1_pca_ses'] = df['treat1'] * df['pca_ses'] 
-    df['female_pca_ses'] = df['female'] * df['pca_ses']
-    df['bihar_pca_ses'] = df['bihar'] * df['pca_ses']
-
-    #     ##  Interactions for Muslims versus High Caste
-    df['treat1_female_bihar_muslim'] = df['treat1'] * df['female'] * df['bihar'] * df['muslim']
-    df['treat1_female_muslim'] = df['treat2'] * df['female'] * df['muslim']
-    df['female_bihar_muslim'] = df['female'] * df['bihar'] * df['muslim']
-    df['treat1_bihar_muslim'] = df['treat1'] * df['bihar'] * df['muslim']
-    df['treat1_muslim'] = df['treat1'] * df['muslim'] 
-    df['female_muslim'] = df['female'] * df['muslim']
-    df['bihar_muslim'] = df['bihar'] * df['muslim']
-
-    df = df[
-        [
-            'state',
-            'dist',
-            'vpsu',
-            'village',
-            'age',
-            'hhwt',
-            'hhheadmale',
-            'hhheadschool',
-            'currgrade',
-            'enrollment_secschool',
-            'enrollment_middleschool',
-            'female',
-            'bihar',
-            'sc',
-            'st',
-            'obc',
-            'highcaste',
-            'hindu',
-            'muslim',
-            'electricity',
-            'media',
-            'land',
-            'bpl',
-            'secschool',
-            'secondarydist',
-            'longdist',
-            'middle',
-            'primary',
-            'postoff',
-            'bank',
-            'towndist',
-            'hqdist',
-            'railwaydist',
-            'busdist',
-            'lcurrpop',
-            'distborder',
-            'treat1',
-            'treat2',
-            'treat3',
-            'treat4',
-            'treat5',
-            'treat1_sc',
-            'treat1_st',
-            'treat1_obc',
-            'female_sc',
-            'female_st',
-            'female_obc',
-            'bihar_sc',
-            'bihar_st',
-            'bihar_obc',
-            'treat1_longdist',
-            'treat2_longdist',
-            'treat3_longdist',
-            'treat4_longdist',
-            'female_longdist',
-            'bihar_longdist',
-            'treat1_bihar_sc',
-            'treat1_bihar_st',
-            'treat1_bihar_obc',
-            'treat1_female_sc',
-            'treat1_female_st',
-            'treat1_female_obc',
-            'female_bihar_sc',
-            'female_bihar_st',
-            'female_bihar_obc',
-            'treat1_female_bihar_longdist',
-            'treat2_female_bihar_longdist',
-            'treat3_female_bihar_longdist',
-            'treat4_female_bihar_longdist',
-            'treat1_female_bihar_sc',
-            'treat1_female_bihar_st',
-            'treat1_female_bihar_obc',
-            'treat1_female_bihar',
-            'treat2_female_bihar',
-            'treat3_female_bihar',
-            'treat4_female_bihar',
-            'treat5_female_bihar',
-            'treat1_female',
-            'treat2_female',
-            'treat3_female',
-            'treat4_female',
-            'treat5_female',
-            'treat1_bihar',
-            'treat2_bihar',
-            'treat3_bihar',
-            'treat4_bihar',
-            'treat5_bihar',
-            'female_bihar',
-            'treat1_bihar_longdist',
-            'treat2_bihar_longdist',
-            'treat3_bihar_longdist',
-            'treat4_bihar_longdist',
-            'treat1_female_longdist',
-            'treat2_female_longdist',
-            'treat3_female_longdist',
-            'treat4_female_longdist',
-            'female_bihar_longdist',
-            'pca_asset',
-            'pca_ses',
-            'treat1_female_bihar_pca_asset',
-            'treat1_female_pca_asset',
-            'female_bihar_pca_asset',
-            'treat1_bihar_pca_asset',
-            'treat1_pca_asset',
-            'female_pca_asset',
-            'bihar_pca_asset',
-            'treat1_female_bihar_pca_ses',
-            'treat1_female_pca_ses',
-            'female_bihar_pca_ses',
-            'treat1_bihar_pca_ses',
-            'treat1_pca_ses',
-            'female_pca_ses',
-            'bihar_pca_ses',
-            'treat1_female_bihar_muslim',
-            'treat1_female_muslim',
-            'female_bihar_muslim',
-            'treat1_bihar_muslim',
-            'treat1_muslim',
-            'female_muslim',
-            'bihar_muslim'
-        ]
-    ] 
-
-    df.replace([np.inf, -np.inf], np.nan, inplace=True)
+    ## Various Interactions needed to perform DD, DDD, DDDD Analysis - computed on first use when lazy
+    interactions = _interaction_specs(_INTERACTIONS)
+    interactions.update(_RENAMED_INTERACTIONS)
+    base_columns = [c for c in _REG_DATA_COLUMNS if c not in interactions]
+    df = df[base_columns].replace([np.inf, -np.inf], np.nan)
+    ## Compact mode - bool/nullable int dummies and categorical codes, see compact_dtypes
+    if compact:
+        df = compact_dtypes(df)
+    if lazy:
+        return RegressionFrame(df, interactions, _REG_DATA_COLUMNS, compact=compact)
+
+    interaction_df = gen_interactions(df, interactions)
+    if compact:
+        interaction_df = compact_dtypes(interaction_df)
+    df = pd.concat([df, interaction_df], axis=1)
+
+    return df[_REG_DATA_COLUMNS]
+
+
+class ReplicationArchive:
+    """
+    Read access to the data sets shipped in data/original_data.zip. The archive
+    is opened once and members are streamed straight into the readers, by file
+    name (e.g. "exam_data.dta"). Nothing is written to disk unless extract_dir
+    is given, in which case each member is extracted there on first use and
+    read from the extracted copy afterwards.
+    """
+
+    def __init__(self, zip_path='./data/original_data.zip', extract_dir=None):
+        self.zip_path = zip_path
+        self._zip = zipfile.ZipFile(zip_path)
+        self._members = {
+            os.path.basename(member): member
+            for member in self._zip.namelist()
+            if not member.endswith('/')
+        }
+        self.extract_dir = extract_dir
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._zip.close()
+
+    def names(self):
+        return list(self._members)
+
+    def info(self, name):
+        return self._zip.getinfo(self._members[name])
+
+    def size(self, name):
+        return self.info(name).file_size
+
+    def _extract(self, member):
+        target = os.path.join(self.extract_dir, member)
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with self._zip.open(member) as source, open(target + '.tmp', 'wb') as f:
+                shutil.copyfileobj(source, f)
+            os.replace(target + '.tmp', target)
+        return target
+
+    def open(self, name):
+        member = self._members[name]
+        if self.extract_dir is not None:
+            return open(self._extract(member), 'rb')
+        return self._zip.open(member)
+
+    def read_stata(self, name, **kwargs):
+        with self.open(name) as f:
+            return pd.read_stata(f, **kwargs)
+
+
+def _file_hash(f, chunk_size=2 ** 20):
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(chunk_size), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def read_dlhs_long(dta_path, columns=_DLHS_COLUMNS, states=(10, 20), chunksize=100000):
+    """
+    Reads the DLHS long file (a path or an open binary file) in chunks of
+    chunksize rows, keeping only the given columns and the rows of the given
+    states (Bihar and Jharkhand by default). pandas' StataReader copies the
+    whole file into memory before it parses it, so the raw bytes of the
+    national file are still held once; what the chunks bound is the parsed
+    data, as only the kept rows and columns are ever converted to a frame.
+    The index matches that of a full read_stata, and a file without rows of
+    the states gives an empty frame with the dtypes of the file.
+    """
+    chunks = []
+    empty = None
+    reader = pd.read_stata(
+        dta_path, columns=columns, convert_categoricals=False, chunksize=chunksize
+    )
+    with reader:
+        for chunk in reader:
+            if empty is None:
+                empty = chunk.iloc[:0]
+            chunk = chunk.loc[chunk['state'].isin(states)]
+            if len(chunk):
+                chunks.append(chunk)
+    if chunks:
+        return pd.concat(chunks)
+    if empty is None:
+        ## A file without observations yields no chunk - read it whole (it is empty) for its dtypes
+        if hasattr(dta_path, 'seek'):
+            dta_path.seek(0)
+        empty = pd.read_stata(dta_path, columns=columns, convert_categoricals=False)
+    return empty
+
+def _open_dta(dta_path, archive=None):
+    if archive is not None:
+        return archive.open(dta_path)
+    return open(dta_path, 'rb')
+
+def _dta_keys(dta_path, archive=None):
+    ## Which input the cache is of (the archive member or the file path), and its version -
+    # the CRC and size of an archive member, the size and modification time of a file, or the
+    # hash of the content when the file cannot be stat-ed
+    if archive is not None:
+        info = archive.info(dta_path)
+        source = os.path.abspath(archive.zip_path) + ':' + info.filename
+        return source, 'crc:{}:{}'.format(info.CRC, info.file_size)
+    source = os.path.abspath(dta_path)
+    try:
+        stat = os.stat(dta_path)
+    except OSError:
+        with _open_dta(dta_path) as f:
+            return source, 'sha256:' + _file_hash(f)
+    return source, 'stat:{}:{}'.format(stat.st_size, stat.st_mtime_ns)
+
+def _dlhs_reg_data_cache_path(dta_path, cache_dir='out/cache', compact=False, archive=None):
+    ## dlhs_reg_data[_compact]_<input>_<version>.feather - the version also covers this module's source
+    source, version = _dta_keys(dta_path, archive)
+    with open(__file__, 'rb') as module_source:
+        version = hashlib.sha256((version + _file_hash(module_source)).encode())
+    prefix = 'dlhs_reg_data_compact_' if compact else 'dlhs_reg_data_'
+    source = hashlib.sha256(source.encode()).hexdigest()[:8]
+    return os.path.join(cache_dir, prefix + source + '_' + version.hexdigest()[:16] + '.feather')
+
+def _read_dlhs_reg_data_cache(cache_path):
+    table = feather.read_table(cache_path, memory_map=True)
+    df = table.to_pandas().set_index(_CACHE_INDEX)
+    df.index.name = None
+    return df
 
+def _write_dlhs_reg_data_cache(df, cache_path):
+    ## Older versions of the cache of the same input are deleted, those of other inputs are kept
+    stale_pattern = cache_path[: -len('????????????????.feather')] + '????????????????.feather'
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    for stale in glob.glob(stale_pattern):
+        os.remove(stale)
+    temp_path = cache_path + '.tmp'
+    df.rename_axis(_CACHE_INDEX).reset_index().to_feather(
+        temp_path, compression='uncompressed'
+    )
+    os.replace(temp_path, cache_path)
+
+def load_dlhs_reg_data(dta_path, cache_dir='out/cache', compact=False, archive=None):
+    """
+    Returns gen_dlhs_reg_data of the DLHS Stata file at dta_path, or of the
+    member of that name when a ReplicationArchive is passed. The derived
+    frame is stored as an uncompressed feather file in cache_dir, and later
+    calls read it back (one copy out of the memory-mapped file) instead of
+    parsing and deriving again. The name of the file identifies the input and
+    its version: the CRC and size of an archive member or the size and
+    modification time of a file, together with the hash of this module's
+    source, so a warm load never reads the Stata file. A change to either
+    changes the name, so a stale cache is never read, and the older caches
+    of the same input are deleted the next time the cache is written.
+    """
+    cache_path = _dlhs_reg_data_cache_path(dta_path, cache_dir, compact, archive)
+    if os.path.exists(cache_path):
+        return _read_dlhs_reg_data_cache(cache_path)
+
+    with _open_dta(dta_path, archive) as f:
+        dlhs_long_wdist = read_dlhs_long(f)
+    df = gen_dlhs_reg_data(dlhs_long_wdist, compact=compact)
+    _write_dlhs_reg_data_cache(df, cache_path)
     return df
 
 
+def _load_dataset(archive, reader, file, options):
+    if reader == 'dlhs_reg_data':
+        return load_dlhs_reg_data(file, archive=archive, **options)
+    return archive.read_stata(file, **options)
+
+def _load_dataset_in_process(zip_path, extract_dir, reader, file, options):
+    with ReplicationArchive(zip_path, extract_dir) as archive:
+        return _load_dataset(archive, reader, file, options)
+
+def _cache_dlhs_reg_data_in_process(zip_path, extract_dir, file, compact, cache_path):
+    with ReplicationArchive(zip_path, extract_dir) as archive:
+        with archive.open(file) as f:
+            dlhs_long_wdist = read_dlhs_long(f)
+    _write_dlhs_reg_data_cache(gen_dlhs_reg_data(dlhs_long_wdist, compact=compact), cache_path)
+    return cache_path
+
+def _load_dlhs_reg_data_cached_or_in_process(processes, archive, file, options):
+    # a cached derivation is only read back, which is cheapest in this process. Otherwise the
+    # worker derives the frame and writes it to the cache path computed here, and the frame
+    # is read back from the feather file instead of being pickled to this process
+    cache_path = _dlhs_reg_data_cache_path(file, archive=archive, **options)
+    if not os.path.exists(cache_path):
+        future = processes.submit(
+            _cache_dlhs_reg_data_in_process,
+            archive.zip_path,
+            archive.extract_dir,
+            file,
+            options.get('compact', False),
+            cache_path,
+        )
+        future.result()
+    return _read_dlhs_reg_data_cache(cache_path)
+
+def load_datasets(archive, names=None, large_size=2 ** 25, max_workers=None):
+    """
+    Loads the data sets of _DATASETS given in names (all by default) from a
+    ReplicationArchive concurrently and returns a dict name -> DataFrame.
+    Members larger than large_size bytes are parsed in a process pool, the
+    others in a thread pool sharing the open archive; an already cached
+    regression frame is always read in-process. Names that map to the same
+    file, reader and options are loaded once and share one frame.
+    """
+    names = list(_DATASETS) if names is None else list(names)
+    tasks = {}
+    for name in names:
+        reader, file, options = _DATASETS[name]
+        tasks.setdefault((reader, file, tuple(sorted(options.items()))), []).append(name)
+
+    frames = {}
+    with ProcessPoolExecutor(max_workers) as processes, ThreadPoolExecutor(max_workers) as threads:
+        futures = {}
+        for (reader, file, options), task_names in tasks.items():
+            options = dict(options)
+            if archive.size(file) <= large_size:
+                future = threads.submit(_load_dataset, archive, reader, file, options)
+            elif reader == 'dlhs_reg_data':
+                future = threads.submit(
+                    _load_dlhs_reg_data_cached_or_in_process,
+                    processes,
+                    archive,
+                    file,
+                    options,
+                )
+            else:
+                future = processes.submit(
+                    _load_dataset_in_process,
+                    archive.zip_path,
+                    archive.extract_dir,
+                    reader,
+                    file,
+                    options,
+                )
+            futures[future] = task_names
+        for future, task_names in futures.items():
+            df = future.result()
+            for name in task_names:
+                frames[name] = df
+    return {name: frames[name] for name in names}
@@ -0,0 +1,859 @@
+import hashlib
+import os
+import zipfile
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+import statsmodels.api as sm
+from scipy import stats
+from statsmodels.base import wrapper as wrap
+from statsmodels.regression.linear_model import (
+    RegressionResults,
+    RegressionResultsWrapper,
+)
+from auxiliary.auxiliary_data_management import expand_dtypes
+
+
+_CELL_STATS = ["_group", "_n", "_sw", "_swy", "_swyy"]
+
+
+class ClusterKernel:
+    """
+    CRV1 cluster robust covariances for fits that share a sample.
+
+    The rows are sorted by cluster once; the per cluster score sums of every
+    fit on the same rows are then a single np.add.reduceat and the meat one
+    matmul, with the small sample correction statsmodels' cluster covariance
+    applies.
+    """
+
+    def __init__(self, groups):
+        self.groups = np.asarray(groups)
+        self.order = np.argsort(self.groups, kind="stable")
+        ordered = self.groups[self.order]
+        self.starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        self.n_groups = len(self.starts)
+
+    def score_sums(self, scores):
+        return np.add.reduceat(scores[self.order], self.starts, axis=0)
+
+    def cov(self, scores, bread, nobs=None):
+        # nobs defaults to the number of score rows, but a fit on collapsed
+        # cells has to be corrected with the number of observations
+        nobs = scores.shape[0] if nobs is None else nobs
+        k_params = scores.shape[1]
+        sums = self.score_sums(scores)
+        correction = (self.n_groups / (self.n_groups - 1.0)) * (
+            (nobs - 1.0) / (nobs - k_params)
+        )
+        return correction * bread @ (sums.T @ sums) @ bread
+
+
+def _use_cluster_cov(results, kernel, cov):
+    # what get_robustcov_results(cov_type="cluster") sets on a results
+    # instance, with the covariance computed by the kernel
+    results.cov_type = "cluster"
+    results.cov_kwds = {
+        "groups": kernel.groups,
+        "use_correction": True,
+        "description": "Standard Errors are robust to cluster correlation (cluster)",
+    }
+    results.use_t = False
+    results.n_groups = kernel.n_groups
+    results.df_resid_inference = kernel.n_groups - 1
+    results.cov_params_default = cov
+    return results
+
+
+def collapse_cells(y, X, weights, groups):
+    # One row per distinct (regressors, cluster) cell with the weighted
+    # sufficient statistics of the outcome inside it. Also returns the cell
+    # code of every observation so micro level quantities can be recovered
+    y = np.asarray(y, dtype=float).reshape(-1)
+    weights = np.asarray(weights, dtype=float)
+    keys = X.assign(_group=np.asarray(groups))
+    codes = (
+        keys.groupby(list(keys.columns), sort=False, dropna=False).ngroup().to_numpy()
+    )
+    n_cells = codes.max() + 1
+    first = np.unique(codes, return_index=True)[1]
+
+    cells = keys.iloc[first].reset_index(drop=True)
+    cells["_n"] = np.bincount(codes, minlength=n_cells)
+    cells["_sw"] = np.bincount(codes, weights=weights, minlength=n_cells)
+    cells["_swy"] = np.bincount(codes, weights=weights * y, minlength=n_cells)
+    cells["_swyy"] = np.bincount(codes, weights=weights * y * y, minlength=n_cells)
+    return cells, codes
+
+
+class CollapsedWLSResults(RegressionResults):
+    """
+    WLS results fitted on cell sufficient statistics.
+
+    The model is the WLS of the cell means on the cell regressors weighted by
+    the cell weight sums, which has the same coefficients as the micro data
+    regression. Everything that depends on the micro data (nobs, residuals,
+    sums of squares, likelihood and the village clustered covariance) is
+    rebuilt from the cell codes and sufficient statistics, so the results match
+    ``sm.WLS(y, X, weights).fit(cov_type="cluster", cov_kwds={"groups": groups})``.
+    """
+
+    def __init__(
+        self, model, params, normalized_cov_params, cells, codes, endog, weights
+    ):
+        self._cells = cells
+        self._codes = codes
+        self._endog = endog
+        self._weights = weights
+        super().__init__(model, params, normalized_cov_params)
+        self.df_resid = self.nobs - model.rank
+
+        kernel = ClusterKernel(cells["_group"])
+        _use_cluster_cov(self, kernel, self._cluster_cov(kernel))
+
+    def _cluster_cov(self, kernel):
+        # the score of a cell is the sum of the scores of the observations in
+        # it, so the clusters only need the cell scores
+        exog = self.model.exog
+        cell_resid = self._cells["_swy"].to_numpy() - self._cells[
+            "_sw"
+        ].to_numpy() * (exog @ self.params)
+        scores = exog * cell_resid[:, None]
+        return kernel.cov(scores, self.normalized_cov_params, nobs=self.nobs)
+
+    @cached_property
+    def nobs(self):
+        return float(self._cells["_n"].sum())
+
+    @cached_property
+    def fittedvalues(self):
+        fitted = self.model.exog @ self.params
+        return pd.Series(fitted[self._codes], index=self._endog.index)
+
+    @cached_property
+    def resid(self):
+        return self._endog - self.fittedvalues
+
+    @cached_property
+    def wresid(self):
+        return self.resid * np.sqrt(self._weights)
+
+    @cached_property
+    def centered_tss(self):
+        cells = self._cells
+        return cells["_swyy"].sum() - cells["_swy"].sum() ** 2 / cells["_sw"].sum()
+
+    @cached_property
+    def uncentered_tss(self):
+        return self._cells["_swyy"].sum()
+
+    @cached_property
+    def llf(self):
+        nobs2 = self.nobs / 2.0
+        llf = -np.log(self.ssr) * nobs2
+        llf -= (1 + np.log(np.pi / nobs2)) * nobs2
+        llf += 0.5 * np.sum(np.log(self._weights))
+        return llf
+
+
+class CollapsedWLSResultsWrapper(RegressionResultsWrapper):
+    # residuals and fitted values are per observation, not per cell, and are
+    # already returned with the index of the micro data
+    _wrap_attrs = {
+        attr: how
+        for attr, how in RegressionResultsWrapper._wrap_attrs.items()
+        if how != "rows"
+    }
+
+
+wrap.populate_wrapper(CollapsedWLSResultsWrapper, CollapsedWLSResults)
+
+
+def fit_collapsed_wls(y, X, weights, groups):
+    # WLS with village clustered standard errors solved on (cell x village)
+    # sufficient statistics. Exact for any design, but only pays off when the
+    # regressors take few distinct values, e.g. the binary DDD specifications,
+    # where the fit no longer depends on the number of children
+    endog_name = y.columns[0] if isinstance(y, pd.DataFrame) else y.name
+    cells, codes = collapse_cells(y, X, weights, groups)
+
+    exog = cells.drop(_CELL_STATS, axis=1)
+    endog = pd.Series(cells["_swy"] / cells["_sw"], name=endog_name)
+    model = sm.WLS(endog, exog, weights=cells["_sw"])
+    fit = model.fit()
+
+    results = CollapsedWLSResults(
+        model,
+        np.asarray(fit.params),
+        np.asarray(fit.normalized_cov_params),
+        cells,
+        codes,
+        pd.Series(np.asarray(y, dtype=float).reshape(-1), index=X.index),
+        np.asarray(weights, dtype=float),
+    )
+    return CollapsedWLSResultsWrapper(results)
+
+
+def fit_nested_wls(data, outcome, blocks, weights, groups):
+    # WLS with clustered standard errors for the nested specifications of a
+    # table: specification k uses the constant and blocks[0] + ... + blocks[k]
+    # on the rows without missing values in them, the outcome, the weights
+    # and the clusters (as dropna(how="any") does in the tables). The samples
+    # shrink as blocks are added, so every row is assigned to the smallest
+    # specification it drops out after, and X'WX and X'Wy of each stratum are
+    # accumulated once, from the smallest sample outwards. Each specification
+    # is then solved on the leading sub-block of its accumulated Gram matrix
+    required = [outcome, weights, groups]
+    masks = []
+    for block in blocks:
+        required = required + block
+        masks.append(data[required].notna().all(axis=1).to_numpy())
+
+    sample = data.loc[masks[0]]
+    masks = [mask[masks[0]] for mask in masks]
+    regressors = [c for block in blocks for c in block]
+    sizes = 1 + np.cumsum([len(block) for block in blocks])
+    # the constant goes first, as sm.add_constant puts it, and the design is
+    # kept as one float block so the per specification slices are cheap
+    design = np.column_stack(
+        [np.ones(len(sample)), sample[regressors].to_numpy(dtype=float)]
+    )
+    X = pd.DataFrame(design, index=sample.index, columns=["const"] + regressors)
+    endog = sample[outcome].to_numpy(dtype=float)
+    wdesign = design * sample[weights].to_numpy(dtype=float)[:, None]
+    depth = np.sum(masks, axis=0) - 1
+
+    gram = np.zeros((design.shape[1], design.shape[1]))
+    cross = np.zeros(design.shape[1])
+    solved = []
+    for k in reversed(range(len(blocks))):
+        # regressors beyond the leading block of a specification may be
+        # missing in its rows and are never read
+        rows, p = depth == k, sizes[k]
+        gram[:p, :p] += wdesign[rows, :p].T @ design[rows, :p]
+        cross[:p] += wdesign[rows, :p].T @ endog[rows]
+        # pinv(X'WX) X'Wy is the minimum norm solution that statsmodels'
+        # pinv(W^1/2 X) W^1/2 y gives, also for rank deficient designs
+        normalized_cov_params = np.linalg.pinv(gram[:p, :p], hermitian=True)
+        rank = np.linalg.matrix_rank(gram[:p, :p], hermitian=True)
+        solved.append((normalized_cov_params @ cross[:p], normalized_cov_params, rank))
+
+    results, previous = [], None
+    for mask, p, (params, normalized_cov_params, rank) in zip(
+        masks, sizes, reversed(solved)
+    ):
+        spec = sample.loc[mask]
+        model = sm.WLS(spec[outcome], X.iloc[mask, :p], weights=spec[weights])
+        model.rank = rank
+        model.normalized_cov_params = normalized_cov_params
+        fit = RegressionResults(model, params, normalized_cov_params)
+        scores = model.wexog * fit.wresid[:, None]
+        # specifications that lose no rows share the cluster sort
+        if previous is None or not np.array_equal(mask, previous):
+            kernel = ClusterKernel(spec[groups])
+        previous = mask
+        _use_cluster_cov(fit, kernel, kernel.cov(scores, normalized_cov_params))
+        results.append(RegressionResultsWrapper(fit))
+    return results
+
+
+def fit_grouped_wls(data, outcome, regressors, weights, groups, by):
+    # The same WLS with clustered standard errors in every group of `by`.
+    # The rows are sorted once by the group keys and the clusters, so every
+    # group is a contiguous block whose cross products and cluster score sums
+    # come from slices of one design matrix. Returns a tidy frame of params,
+    # bse and nobs indexed by the group keys and the term
+    data = data.sort_values(by + [groups], kind="mergesort")
+    design = np.column_stack(
+        [np.ones(len(data)), data[regressors].to_numpy(dtype=float)]
+    )
+    endog = data[outcome].to_numpy(dtype=float)
+    wdesign = design * data[weights].to_numpy(dtype=float)[:, None]
+    clusters = data[groups].to_numpy()
+    keys = data[by].to_numpy()
+    bounds = np.flatnonzero(
+        np.r_[True, np.any(keys[1:] != keys[:-1], axis=1), True]
+    )
+
+    terms = ["const"] + regressors
+    index, params, bse, nobs = [], [], [], []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        X, wX, y = design[start:stop], wdesign[start:stop], endog[start:stop]
+        normalized_cov_params = np.linalg.pinv(wX.T @ X, hermitian=True)
+        group_params = normalized_cov_params @ (wX.T @ y)
+        scores = wX * (y - X @ group_params)[:, None]
+        kernel = ClusterKernel(clusters[start:stop])
+        cov = kernel.cov(scores, normalized_cov_params)
+
+        index += [tuple(keys[start]) + (term,) for term in terms]
+        params.append(group_params)
+        bse.append(np.sqrt(np.diag(cov)))
+        nobs += [stop - start] * len(terms)
+
+    return pd.DataFrame(
+        {"params": np.concatenate(params), "bse": np.concatenate(bse), "nobs": nobs},
+        index=pd.MultiIndex.from_tuples(index, names=by + ["term"]),
+    )
+
+
+# the frame of a specification worker
+_shared_frame = {}
+
+
+class SharedFrame:
+    """
+    A numeric frame copied once into shared memory.
+
+    Worker processes map the block read-only with ``_attach_shared_frame``
+    instead of receiving a pickled copy of the frame with every task.
+    """
+
+    def __init__(self, df):
+        values = df.to_numpy(dtype=float)
+        self._memory = shared_memory.SharedMemory(
+            create=True, size=max(values.nbytes, 1)
+        )
+        np.ndarray(values.shape, dtype=float, buffer=self._memory.buf)[:] = values
+        self.spec = (self._memory.name, values.shape, list(df.columns), df.index)
+
+    def close(self):
+        self._memory.close()
+        self._memory.unlink()
+
+
+def _attach_shared_frame(name, shape, columns, index):
+    memory = shared_memory.SharedMemory(name=name)
+    values = np.ndarray(shape, dtype=float, buffer=memory.buf)
+    values.flags.writeable = False
+    _shared_frame["memory"] = memory
+    _shared_frame["frame"] = pd.DataFrame(
+        values, index=index, columns=columns, copy=False
+    )
+
+
+def _fit_shared_specification(sample, outcome, blocks, weights, groups):
+    data = shared_frame()
+    results = fit_nested_wls(
+        data.loc[data[sample] == 1], outcome, blocks, weights, groups
+    )
+    # only the records are sent back, not the data of the fits
+    return [RegressionRecord.from_results(fit) for fit in results]
+
+
+def shared_frame():
+    # the frame of the running map_shared call, in a worker or inline
+    return _shared_frame["frame"]
+
+
+def map_shared(function, data, tasks, max_workers=None):
+    # function(*task) for every task, where function is a module level function
+    # that reads data with shared_frame(). With more than one worker the frame
+    # is put in shared memory once and the tasks run in a process pool; the
+    # results come back in the order of the tasks
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    if max_workers <= 1:
+        _shared_frame.update(frame=data)
+        try:
+            return [function(*task) for task in tasks]
+        finally:
+            _shared_frame.clear()
+
+    shared = SharedFrame(data)
+    try:
+        with ProcessPoolExecutor(
+            max_workers, initializer=_attach_shared_frame, initargs=shared.spec
+        ) as pool:
+            return list(pool.map(function, *zip(*tasks)))
+    finally:
+        shared.close()
+
+
+def fit_specifications(data, specifications, max_workers=None):
+    # Fits independent chains of nested WLS specifications with clustered
+    # standard errors. Each specification is (sample, outcome, blocks,
+    # weights, groups), where sample names a 0/1 column of data, and gives a
+    # RegressionRecord of each fit_nested_wls result on the rows of the
+    # sample. The chains run with map_shared, so in a process pool with more
+    # than one worker; the results come back in the order of the specifications
+    return map_shared(_fit_shared_specification, data, specifications, max_workers)
+
+
+# what the tables read from a fit, stored by ResultCache. f_pvalue is read
+# before fvalue, as stargazer does: with a robust covariance, reading fvalue
+# first caches the p-value of the robust Wald test instead
+_PAYLOAD_SCALARS = [
+    "nobs",
+    "df_model",
+    "df_resid",
+    "rsquared",
+    "rsquared_adj",
+    "f_pvalue",
+    "fvalue",
+    "resid_ss",
+]
+
+
+def _results_payload(results):
+    payload = {
+        "names": np.asarray(results.params.index, dtype=str),
+        "params": np.asarray(results.params, dtype=float),
+        "cov": np.asarray(results.cov_params(), dtype=float),
+        "endog_name": np.asarray(results.model.endog_names, dtype=str),
+        "resid_ss": np.sum(np.square(np.asarray(results.resid))),
+    }
+    for name in _PAYLOAD_SCALARS[:-1]:
+        payload[name] = np.squeeze(np.asarray(getattr(results, name), dtype=float))
+    return payload
+
+
+class RegressionRecord:
+    """
+    The estimates and fit statistics of a regression as the tables print them.
+
+    Holds the coefficients and their covariance but none of the data, so a
+    rendered table keeps O(k^2) numbers per fit alive instead of its design
+    matrix, residuals and weights. Inference is on the normal distribution,
+    as for the robust fits of the tables.
+    """
+
+    __slots__ = ["params", "cov", "endog_name"] + _PAYLOAD_SCALARS
+
+    def __init__(self, payload):
+        names = list(payload["names"])
+        self.params = pd.Series(payload["params"], index=names)
+        self.cov = payload["cov"]
+        self.endog_name = str(payload["endog_name"])
+        for name in _PAYLOAD_SCALARS:
+            setattr(self, name, float(payload[name]))
+
+    @classmethod
+    def from_results(cls, results):
+        return cls(_results_payload(results))
+
+    def payload(self):
+        payload = {
+            "names": np.asarray(self.params.index, dtype=str),
+            "params": self.params.to_numpy(),
+            "cov": self.cov,
+            "endog_name": np.asarray(self.endog_name, dtype=str),
+        }
+        for name in _PAYLOAD_SCALARS:
+            payload[name] = np.asarray(getattr(self, name))
+        return payload
+
+    @property
+    def bse(self):
+        return pd.Series(np.sqrt(np.diag(self.cov)), index=self.params.index)
+
+    @property
+    def tvalues(self):
+        return self.params / self.bse
+
+    @property
+    def pvalues(self):
+        return pd.Series(
+            stats.norm.sf(np.abs(self.tvalues)) * 2, index=self.params.index
+        )
+
+    def conf_int(self, alpha=0.05):
+        q = stats.norm.ppf(1 - alpha / 2)
+        return pd.DataFrame(
+            {0: self.params - q * self.bse, 1: self.params + q * self.bse}
+        )
+
+
+class ResultCache:
+    """
+    Fitted regressions kept on disk across sessions.
+
+    Every entry is an uncompressed .npz file of the payload of one fit, named
+    by its key. Reading an entry marks it as recently used; after a write the
+    least recently used entries are deleted until at most max_entries files
+    of at most max_bytes in total are left.
+    """
+
+    def __init__(
+        self, cache_dir="out/cache/regressions", max_entries=1024, max_bytes=2 ** 27
+    ):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + ".npz")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as payload:
+                record = RegressionRecord(payload)
+            os.utime(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+        return record
+
+    def put(self, key, record):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key)
+        temp_path = path + ".tmp.npz"
+        np.savez(temp_path, **record.payload())
+        os.replace(temp_path, path)
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".npz") and not entry.name.endswith(".tmp.npz"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, path = entries.pop(0)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+# the cache fit_registered_specifications uses by default
+result_cache = ResultCache()
+
+# part of every cache key, so that a change to the estimators of this module
+# or to statsmodels never serves fits of the previous version
+with open(__file__, "rb") as _source:
+    _CACHE_VERSION = hashlib.sha256(
+        _source.read() + sm.__version__.encode()
+    ).hexdigest()
+
+
+# A regression of a table: the outcome (printed as label, if given) on the
+# constant and the regressor blocks, on the rows where all the sample
+# variables are observed, weighted by weights and clustered by groups
+Specification = namedtuple(
+    "Specification", ["outcome", "blocks", "sample", "weights", "groups", "label"]
+)
+
+# the fits of this session by their cache key, which hashes the values of
+# the columns they use, so changing a data set in place never returns the fit
+# of its old values
+_fitted = {}
+
+
+def _specification_key(spec):
+    # specifications with the same design on the same sample are the same
+    # fit, however their regressors are split into blocks
+    return (
+        spec.label or spec.outcome,
+        spec.outcome,
+        tuple(column for block in spec.blocks for column in block),
+        tuple(spec.sample),
+        spec.weights,
+        spec.groups,
+    )
+
+
+def _nested_chains(keys):
+    # Orders the specifications on the same sample, outcome, weights and
+    # clusters into chains in which every regressor list extends the one
+    # before it, so each chain is one fit_nested_wls call
+    chains = []
+    for key in sorted(keys, key=lambda key: len(key[2])):
+        for chain in chains:
+            last = chain[-1]
+            if (last[:2], last[3:]) == (key[:2], key[3:]) and (
+                key[2][: len(last[2])] == last[2]
+            ):
+                chain.append(key)
+                break
+        else:
+            chains.append([key])
+    return chains
+
+
+def _cache_key(frame, key, fingerprints):
+    # the version of the estimators, the specification, the hashes of the
+    # values of the columns it uses and the hash of its sample mask, which is
+    # stored under the tuple of sample variables
+    label, outcome, regressors, sample_variables, weights, groups = key
+    columns = (outcome,) + regressors + sample_variables + (weights, groups)
+    for column in columns:
+        if column not in fingerprints:
+            values = frame[column].to_numpy(dtype=float)
+            fingerprints[column] = hashlib.sha256(values.tobytes()).hexdigest()
+    if sample_variables not in fingerprints:
+        mask = frame[list(sample_variables)].notna().all(axis=1).to_numpy()
+        fingerprints[sample_variables] = hashlib.sha256(mask.tobytes()).hexdigest()
+    content = repr(
+        (
+            _CACHE_VERSION,
+            key,
+            [fingerprints[column] for column in columns + (sample_variables,)],
+        )
+    )
+    return hashlib.sha256(content.encode()).hexdigest()[:32]
+
+
+def _specification_frame(data, keys):
+    # the columns of the specifications with one 0/1 column per distinct
+    # sample, named in the returned dict, and the outcomes under their labels
+    columns = list(
+        dict.fromkeys(
+            column
+            for label, outcome, regressors, sample, weights, groups in keys
+            for column in (outcome,) + regressors + sample + (weights, groups)
+        )
+    )
+    frame = expand_dtypes(data[columns]).copy()
+    samples = {
+        sample: f"_sample_{i}"
+        for i, sample in enumerate(dict.fromkeys(key[3] for key in keys))
+    }
+    for sample, name in samples.items():
+        frame[name] = frame[list(sample)].notna().all(axis=1).astype(float)
+    for label, outcome, *_ in keys:
+        frame[label] = frame[outcome]
+    return frame, samples
+
+
+def _fit_specification_keys(frame, samples, keys, max_workers, cache, cache_keys):
+    # fits already in the result cache are not fitted again
+    cached = {}
+    if cache is not None:
+        for key in keys:
+            record = cache.get(cache_keys[key])
+            if record is not None:
+                cached[key] = record
+        keys = [key for key in keys if key not in cached]
+
+    columns = {
+        column
+        for label, outcome, regressors, sample, weights, groups in keys
+        for column in regressors
+    }
+    binary = {column: frame[column].dropna().isin([0, 1]).all() for column in columns}
+
+    fitted, nested = {}, []
+    for key in keys:
+        label, _, regressors, sample, weights, groups = key
+        if not all(binary[column] for column in regressors):
+            nested.append(key)
+            continue
+        # only binary regressors: solved on (cell x cluster) sufficient
+        # statistics
+        variables = [label] + list(regressors) + [weights, groups]
+        rows = (frame[samples[sample]] == 1) & frame[variables].notna().all(axis=1)
+        spec = frame.loc[rows, variables]
+        fitted[key] = RegressionRecord.from_results(
+            fit_collapsed_wls(
+                spec[label],
+                sm.add_constant(spec[list(regressors)]),
+                spec[weights],
+                spec[groups],
+            )
+        )
+
+    chains = _nested_chains(nested)
+    specifications = []
+    for chain in chains:
+        label, _, regressors, sample, weights, groups = chain[0]
+        blocks = [list(regressors)] + [
+            list(key[2][len(before[2]) :]) for before, key in zip(chain, chain[1:])
+        ]
+        specifications.append((samples[sample], label, blocks, weights, groups))
+    if specifications:
+        results = fit_specifications(frame, specifications, max_workers=max_workers)
+        for chain, chain_results in zip(chains, results):
+            fitted.update(zip(chain, chain_results))
+    if cache is not None:
+        for key, record in fitted.items():
+            cache.put(cache_keys[key], record)
+    return {**cached, **fitted}
+
+
+def fit_registered_specifications(
+    data, specifications, max_workers=None, cache=result_cache
+):
+    # Fits a list of Specification on data, returning the results in the same
+    # order. Every specification is keyed by the hashes of the values of the
+    # columns it uses, and identical keys are fitted once, also across calls,
+    # so tables that print the same regression share it while a data set
+    # changed in place is fitted again. Every fit comes back as a
+    # RegressionRecord, and those found in the result cache (pass cache=None
+    # to skip it) are not fitted again. The specifications still to fit share
+    # one frame: those with only binary regressors are solved on cell
+    # sufficient statistics, the others in chains of nested specifications
+    # that run in a process pool
+    keys = [_specification_key(spec) for spec in specifications]
+    unique_keys = list(dict.fromkeys(keys))
+    frame, samples = _specification_frame(data, unique_keys)
+    fingerprints = {}
+    cache_keys = {key: _cache_key(frame, key, fingerprints) for key in unique_keys}
+    missing = [key for key in unique_keys if cache_keys[key] not in _fitted]
+    if missing:
+        fitted = _fit_specification_keys(
+            frame, samples, missing, max_workers, cache, cache_keys
+        )
+        for key, record in fitted.items():
+            _fitted[cache_keys[key]] = record
+    return [_fitted[cache_keys[key]] for key in keys]
+
+
+# the result of a bootstrap test of one coefficient: the estimate, its
+# clustered standard error and t statistic, the p-value and the draws of the
+# t statistic
+CoefficientTest = namedtuple(
+    "CoefficientTest", ["coefficient", "se", "t_stat", "p_value", "draws"]
+)
+
+# Webb's six point distribution: +-sqrt(1/2), +-1, +-sqrt(3/2) with equal
+# probability
+_WEBB_WEIGHTS = np.r_[-np.sqrt([1.5, 1.0, 0.5]), np.sqrt([0.5, 1.0, 1.5])]
+
+
+def _cluster_weights(rng, distribution, shape):
+    if distribution == "rademacher":
+        return rng.choice([-1.0, 1.0], size=shape)
+    if distribution == "webb":
+        return rng.choice(_WEBB_WEIGHTS, size=shape)
+    raise ValueError(f"{distribution!r} is not 'rademacher' or 'webb'")
+
+
+def wild_cluster_bootstrap(
+    y,
+    X,
+    weights,
+    groups,
+    term,
+    replications=9999,
+    distribution="webb",
+    seed=None,
+    block_size=1000,
+):
+    # Wild cluster restricted bootstrap of the clustered t statistic of the
+    # coefficient of term in sm.WLS(y, X, weights), imposing that it is zero.
+    # With a the row of (X'WX)^-1 of the term, s_g the cluster sums of the
+    # weighted scores of the restricted residuals and v_g the weight drawn for
+    # cluster g, a bootstrap coefficient is sum_g v_g a's_g and the term's
+    # part of its cluster scores is v_g a's_g - sum_h v_h a'H_g (X'WX)^-1 s_h.
+    # Everything but the v_g is computed once, so each block of draws is two
+    # matrix products with the (clusters x draws) matrix of weights
+    k = list(X.columns).index(term)
+    design = X.to_numpy(dtype=float)
+    endog = np.asarray(y, dtype=float).reshape(-1)
+    wdesign = design * np.asarray(weights, dtype=float)[:, None]
+    kernel = ClusterKernel(groups)
+    nobs, k_params = design.shape
+    correction = (kernel.n_groups / (kernel.n_groups - 1.0)) * (
+        (nobs - 1.0) / (nobs - k_params)
+    )
+    bread = np.linalg.pinv(wdesign.T @ design, hermitian=True)
+    a = bread[k]
+
+    # the unrestricted estimate and its clustered t statistic
+    params = bread @ (wdesign.T @ endog)
+    sums = kernel.score_sums(wdesign * (endog - design @ params)[:, None])
+    se = np.sqrt(correction * np.sum((sums @ a) ** 2))
+    t_stat = params[k] / se
+
+    # the restricted fit, without the term
+    others = np.delete(np.arange(k_params), k)
+    restricted = np.linalg.pinv(
+        wdesign[:, others].T @ design[:, others], hermitian=True
+    ) @ (wdesign[:, others].T @ endog)
+    resid = endog - design[:, others] @ restricted
+    sums = kernel.score_sums(wdesign * resid[:, None])
+    c = sums @ a
+    d = (kernel.score_sums(wdesign * (design @ a)[:, None]) @ bread) @ sums.T
+
+    rng = np.random.default_rng(seed)
+    draws = []
+    for start in range(0, replications, block_size):
+        v = _cluster_weights(
+            rng, distribution, (kernel.n_groups, min(block_size, replications - start))
+        )
+        scores = c[:, None] * v - d @ v
+        draws.append((c @ v) / np.sqrt(correction * np.sum(scores ** 2, axis=0)))
+    draws = np.concatenate(draws)
+    p_value = np.mean(np.abs(draws) >= np.abs(t_stat))
+    return CoefficientTest(params[k], se, t_stat, p_value, draws)
+
+
+# the result of a permutation test of one coefficient: the estimate, the
+# p-value, its Monte Carlo standard error and the permutation distribution
+PermutationTest = namedtuple(
+    "PermutationTest", ["coefficient", "p_value", "mc_error", "draws"]
+)
+
+
+def permutation_test(
+    y,
+    X,
+    weights,
+    term,
+    base,
+    labels,
+    units,
+    permutations=10000,
+    tol=0.005,
+    seed=None,
+    block_size=500,
+):
+    # Randomization inference for the coefficient of term in
+    # sm.WLS(y, X, weights), where term is base times a 0/1 label that is
+    # constant within units (bihar within districts, or the treated ages
+    # within cohorts). Each draw reassigns the labels across the units and
+    # recomputes the coefficient, holding the other regressors fixed. By
+    # Frisch-Waugh the coefficient is d'W My / d'W Md, with M the residual
+    # maker of the other regressors, so after partialling them out once a
+    # draw only needs per unit sums: a dot product for d'W My and a k vector
+    # for d'W Md. Draws are made in blocks until the Monte Carlo standard
+    # error of the p-value is below tol or all permutations are drawn
+    controls = X.drop(columns=term).to_numpy(dtype=float)
+    endog = np.asarray(y, dtype=float).reshape(-1)
+    w = np.asarray(weights, dtype=float)
+    base = np.asarray(base, dtype=float)
+    wcontrols = controls * w[:, None]
+    bread = np.linalg.pinv(wcontrols.T @ controls, hermitian=True)
+    resid = endog - controls @ (bread @ (wcontrols.T @ endog))
+
+    codes, uniques = pd.factorize(np.asarray(units))
+    n_units = len(uniques)
+    wbase = w * base
+    resid_sums = np.bincount(codes, weights=wbase * resid, minlength=n_units)
+    base_sums = np.bincount(codes, weights=wbase * base, minlength=n_units)
+    control_sums = np.column_stack(
+        [
+            np.bincount(codes, weights=wbase * column, minlength=n_units)
+            for column in controls.T
+        ]
+    )
+    assignment = np.zeros(n_units)
+    assignment[codes] = np.asarray(labels, dtype=float)
+
+    def coefficients(assignments):
+        cross = assignments @ control_sums
+        return (assignments @ resid_sums) / (
+            assignments @ base_sums - np.sum((cross @ bread) * cross, axis=1)
+        )
+
+    coefficient = coefficients(assignment[None, :])[0]
+    rng = np.random.default_rng(seed)
+    draws, hits = [], 0
+    while len(draws) * block_size < permutations:
+        size = min(block_size, permutations - len(draws) * block_size)
+        block = coefficients(rng.permuted(np.tile(assignment, (size, 1)), axis=1))
+        draws.append(block)
+        hits += np.sum(np.abs(block) >= np.abs(coefficient))
+        count = sum(len(draw) for draw in draws)
+        # the observed assignment counts as one of the draws
+        p_value = (hits + 1) / (count + 1)
+        mc_error = np.sqrt(p_value * (1 - p_value) / count)
+        if mc_error < tol:
+            break
+    return PermutationTest(coefficient, p_value, mc_error, np.concatenate(draws))
@@ -2,7 +2,278 @@ import numpy as np
 import pandas as pd
 import statsmodels.api as sm
 from stargazer.stargazer import Stargazer, LineLocation
+from stargazer.translators import register_class
 from IPython.display import Markdown as md
+from auxiliary.auxiliary_data_management import expand_dtypes
+from auxiliary.auxiliary_regressions import (
+    RegressionRecord,
+    Specification,
+    fit_grouped_wls,
+    fit_registered_specifications,
+    permutation_test,
+    wild_cluster_bootstrap,
+)
+
+
+
+def _record_model_data(record):
+    # what stargazer reads from statsmodels results, for a RegressionRecord
+    conf_int = record.conf_int()
+    return {
+        "p_values": record.pvalues,
+        "cov_values": record.params,
+        "cov_std_err": record.bse,
+        "r2": record.rsquared,
+        "r2_adj": record.rsquared_adj,
+        "pseudo_r2": None,
+        "f_p_value": record.f_pvalue,
+        "degree_freedom": record.df_model,
+        "degree_freedom_resid": record.df_resid,
+        "nobs": record.nobs,
+        "f_statistic": record.fvalue,
+        "dependent_variable": record.endog_name,
+        "cov_names": record.params.index.values,
+        "conf_int_low_values": conf_int[0],
+        "conf_int_high_values": conf_int[1],
+        "resid_std_err": np.sqrt(record.resid_ss / record.df_resid),
+    }
+
+
+register_class(RegressionRecord, _record_model_data)
+
+## Regression specifications of tables 2, 3, 6 and 8
+
+_DEMOGRAPHICS = ["sc", "st", "obc", "hindu", "muslim"]
+
+_HOUSEHOLD = ["hhheadschool", "hhheadmale", "land", "bpl", "media", "electricity"]
+
+_VILLAGE = ["middle", "bank", "postoff", "lcurrpop"]
+
+_DIST = ["busdist", "towndist", "railwaydist", "hqdist"]
+
+_TRIPLE = ["female_bihar", "bihar", "female"]
+
+_QUADRUPLE = _TRIPLE + [
+    "longdist",
+    "bihar_longdist",
+    "female_longdist",
+    "female_bihar_longdist",
+]
+
+
+def _triple_difference(treat):
+    return [
+        f"{treat}_female_bihar",
+        f"{treat}_female",
+        f"{treat}_bihar",
+        "female_bihar",
+        treat,
+        "female",
+        "bihar",
+    ]
+
+
+def _quadruple_difference(treat):
+    return [
+        f"{treat}_female_bihar_longdist",
+        f"{treat}_female_longdist",
+        "female_bihar_longdist",
+        f"{treat}_bihar_longdist",
+        f"{treat}_longdist",
+        "female_longdist",
+        "bihar_longdist",
+        "longdist",
+    ]
+
+
+def _treatment_terms(treat):
+    # the treatment interactions of the panels B and C of table 6, whose
+    # female/bihar/longdist terms are added separately
+    return [f"{treat}_female_bihar", f"{treat}_female", f"{treat}_bihar", treat]
+
+
+def _treatment_longdist_terms(treat):
+    return [
+        f"{treat}_female_bihar_longdist",
+        f"{treat}_female_longdist",
+        f"{treat}_bihar_longdist",
+        f"{treat}_longdist",
+    ]
+
+
+def _columns(outcome, label, treat, columns):
+    # one specification per column: the children with the treatment dummy
+    # and bihar observed, weighted by hhwt and clustered by village
+    return [
+        Specification(outcome, blocks, ["bihar", treat], "hhwt", "village", label)
+        for blocks in columns
+    ]
+
+
+def _grade_9(treat, columns):
+    return _columns(
+        "enrollment_secschool", "Enrolled in or completed grade 9", treat, columns
+    )
+
+
+def _grade_8(treat, columns):
+    return _columns(
+        "enrollment_middleschool", "Enrolled in or completed grade 8", treat, columns
+    )
+
+
+_TABLE_SPECIFICATIONS = {
+    "table_2": _grade_9(
+        "treat1",
+        [
+            [_triple_difference("treat1")],
+            [_triple_difference("treat1"), _DEMOGRAPHICS],
+            [_triple_difference("treat1"), _DEMOGRAPHICS, _HOUSEHOLD],
+            [_triple_difference("treat1"), _DEMOGRAPHICS, _HOUSEHOLD, _VILLAGE + _DIST],
+        ],
+    ),
+    "table_3": _grade_9(
+        "treat1",
+        [
+            [_triple_difference("treat1") + _quadruple_difference("treat1")],
+            [
+                _triple_difference("treat1") + _quadruple_difference("treat1"),
+                _DEMOGRAPHICS,
+            ],
+            [
+                _triple_difference("treat1") + _quadruple_difference("treat1"),
+                _DEMOGRAPHICS,
+                _HOUSEHOLD,
+            ],
+            [
+                _triple_difference("treat1") + _quadruple_difference("treat1"),
+                _DEMOGRAPHICS,
+                _HOUSEHOLD,
+                _VILLAGE + _DIST,
+            ],
+        ],
+    ),
+    "table_6": (
+        # * Panel A: the treatment group is 13, 14 and 15 while the control
+        # group is 16 and 17, triple and quadruple difference *
+        _grade_9(
+            "treat2",
+            [
+                [_triple_difference("treat2")],
+                [_triple_difference("treat2"), _DEMOGRAPHICS],
+                [_triple_difference("treat2"), _DEMOGRAPHICS, _HOUSEHOLD],
+                [
+                    _triple_difference("treat2"),
+                    _DEMOGRAPHICS,
+                    _HOUSEHOLD,
+                    _VILLAGE + _DIST,
+                ],
+                [_triple_difference("treat2") + _quadruple_difference("treat2")],
+                [
+                    _triple_difference("treat2") + _quadruple_difference("treat2"),
+                    _DEMOGRAPHICS,
+                ],
+                [
+                    _triple_difference("treat2") + _quadruple_difference("treat2"),
+                    _DEMOGRAPHICS,
+                    _HOUSEHOLD,
+                ],
+                [
+                    _triple_difference("treat2") + _quadruple_difference("treat2"),
+                    _DEMOGRAPHICS,
+                    _HOUSEHOLD,
+                    _VILLAGE + _DIST,
+                ],
+            ],
+        )
+        # * Panel B: the treatment group is 14 and 15 while the control group
+        # is 16 *
+        # * Panel C: the treatment group is 13, 14 and 15 while the control
+        # group is 16 *
+        + [
+            spec
+            for treat in ["treat3", "treat4"]
+            for spec in _grade_9(
+                treat,
+                [
+                    [_treatment_terms(treat), _TRIPLE],
+                    [_treatment_terms(treat), _DEMOGRAPHICS, _TRIPLE],
+                    [_treatment_terms(treat), _DEMOGRAPHICS, _HOUSEHOLD, _TRIPLE],
+                    [
+                        _treatment_terms(treat),
+                        _DEMOGRAPHICS,
+                        _HOUSEHOLD,
+                        _VILLAGE + _DIST,
+                        _TRIPLE,
+                    ],
+                    [
+                        _treatment_terms(treat) + _treatment_longdist_terms(treat),
+                        _QUADRUPLE,
+                    ],
+                    [
+                        _treatment_terms(treat) + _treatment_longdist_terms(treat),
+                        _QUADRUPLE,
+                        _DEMOGRAPHICS,
+                    ],
+                    [
+                        _treatment_terms(treat) + _treatment_longdist_terms(treat),
+                        _DEMOGRAPHICS,
+                        _HOUSEHOLD,
+                        _QUADRUPLE,
+                    ],
+                    [
+                        _treatment_terms(treat) + _treatment_longdist_terms(treat),
+                        _DEMOGRAPHICS,
+                        _HOUSEHOLD,
+                        _VILLAGE + _DIST,
+                        _QUADRUPLE,
+                    ],
+                ],
+            )
+        ]
+    ),
+    "table_8": _grade_8(
+        "treat5",
+        [
+            [_triple_difference("treat5")],
+            [_triple_difference("treat5"), _DEMOGRAPHICS],
+            [_triple_difference("treat5"), _DEMOGRAPHICS, _HOUSEHOLD],
+            [_triple_difference("treat5"), _DEMOGRAPHICS, _HOUSEHOLD, _VILLAGE + _DIST],
+        ],
+    ),
+}
+
+
+def fit_table_specifications(dlhs_reg_data, tables=None, max_workers=None):
+    # Fits the regressions of several tables (all of tables 2, 3, 6 and 8 by
+    # default) in one go, so the regressions they share are fitted once and
+    # the table functions afterwards only render the cached results
+    tables = list(_TABLE_SPECIFICATIONS) if tables is None else tables
+    fit_registered_specifications(
+        dlhs_reg_data,
+        [spec for table in tables for spec in _TABLE_SPECIFICATIONS[table]],
+        max_workers=max_workers,
+    )
+
+
+def _select_columns(dlhs_reg_data, columns, rename=None):
+    # Works on a DataFrame and on a lazy RegressionFrame alike, so only the
+    # columns a table uses are ever built. Compact dtypes are up-cast here,
+    # right before the design matrices are put together
+    rename = rename or {}
+    source = {new: old for old, new in rename.items()}
+    columns = list(dict.fromkeys(source.get(c, c) for c in columns))
+    return expand_dtypes(dlhs_reg_data[columns]).copy().rename(rename, axis=1)
+
+
+def _markdown_row(label, values, fmt="{}"):
+    # one row of a markdown table: counts are printed as integers, estimates
+    # rounded to 3 decimals
+    if pd.api.types.is_integer_dtype(values):
+        cells = [fmt.format(int(value)) for value in values]
+    else:
+        cells = [fmt.format(round(float(value), 3)) for value in values]
+    return f"|{label}|" + "|".join(cells) + "| \n"
 
 
 def gen_table_one_reg_data(bh_enroll_data_reg):
@@ -126,118 +397,9 @@ def table_1(bh_enroll_data_reg):
 
 
 def table_2(dlhs_reg_data):
-    df = dlhs_reg_data.copy()
-    df.rename(
-        {"enrollment_secschool": "Enrolled in or completed grade 9"},
-        axis=1,
-        inplace=True,
-    )
-
-    # regression 2 data
-    independent_variable = ["Enrolled in or completed grade 9"]
-
-    regression_variables_1 = [
-        "treat1_female_bihar",
-        "treat1_female",
-        "treat1_bihar",
-        "female_bihar",
-        "treat1",
-        "female",
-        "bihar",
-    ]
-
-    regression_variables_2 = [
-        "treat1_female_bihar_longdist",
-        "treat1_female_longdist",
-        "female_bihar_longdist",
-        "treat1_bihar_longdist",
-        "treat1_longdist",
-        "female_longdist",
-        "bihar_longdist",
-        "longdist",
-    ]
-    demographics = ["sc", "st", "obc", "hindu", "muslim"]
-    household = ["hhheadschool", "hhheadmale", "land", "bpl", "media", "electricity"]
-
-    village = ["middle", "bank", "postoff", "lcurrpop"]
-
-    dist = ["busdist", "towndist", "railwaydist", "hqdist"]
-
-    sample_weights = ["village", "hhwt"]
-
-    all_vars = (
-        independent_variable
-        + regression_variables_1
-        + regression_variables_2
-        + demographics
-        + household
-        + village
-        + dist
-        + sample_weights
-    )
-
-    df_reg = df.loc[
-        (df["bihar"] == df["bihar"]) & (df["treat1"] == df["treat1"]), all_vars
-    ]
-    # TABLE 2 - COLUMN 1
-
-    y = df_reg.loc[:, "Enrolled in or completed grade 9"]
-    X = sm.add_constant(df_reg.loc[:, regression_variables_1])
-
-    reg_one = sm.WLS(y, X, weights=df_reg["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg["village"]}
-    )
-
-    # TABLE 2 - COLUMN 2
-
-    X = sm.add_constant(df_reg.loc[:, regression_variables_1 + demographics])
-
-    reg_two = sm.WLS(y, X, weights=df_reg["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg["village"]}
-    )
-
-    # TABLE 2 - COLUMN 3
-
-    reg_three_data = df_reg.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + demographics
-        + household
-        + sample_weights,
-    ].dropna(how="any")
-
-    y = reg_three_data[independent_variable]
-    X = sm.add_constant(
-        reg_three_data.loc[:, regression_variables_1 + demographics + household]
-    )
-
-    reg_three = sm.WLS(y, X, weights=reg_three_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_three_data["village"]}
-    )
-
-    # TABLE 2 - COLUMN 4
-
-    reg_four_data = df_reg.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + demographics
-        + household
-        + sample_weights
-        + village
-        + dist,
-    ].dropna(how="any")
-
-    y = reg_four_data[independent_variable]
-    X = sm.add_constant(
-        reg_four_data.loc[
-            :, regression_variables_1 + demographics + household + village + dist
-        ]
-    )
-
-    reg_four = sm.WLS(y, X, weights=reg_four_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_four_data["village"]}
+    # TABLE 2 - COLUMN 1 TO 4
+    reg_one, reg_two, reg_three, reg_four = fit_registered_specifications(
+        dlhs_reg_data, _TABLE_SPECIFICATIONS["table_2"]
     )
 
     ## Table creation with stargazer package
@@ -283,153 +445,9 @@ def table_2(dlhs_reg_data):
 
 
 def table_3(dlhs_reg_data):
-    df = dlhs_reg_data.copy()
-    df.rename(
-        {"enrollment_secschool": "Enrolled in or completed grade 9"},
-        axis=1,
-        inplace=True,
-    )
-
-    # regression 2 data
-    independent_variable = ["Enrolled in or completed grade 9"]
-
-    regression_variables_1 = [
-        "treat1_female_bihar",
-        "treat1_female",
-        "treat1_bihar",
-        "female_bihar",
-        "treat1",
-        "female",
-        "bihar",
-    ]
-
-    regression_variables_2 = [
-        "treat1_female_bihar_longdist",
-        "treat1_female_longdist",
-        "female_bihar_longdist",
-        "treat1_bihar_longdist",
-        "treat1_longdist",
-        "female_longdist",
-        "bihar_longdist",
-        "longdist",
-    ]
-    demographics = ["sc", "st", "obc", "hindu", "muslim"]
-    household = ["hhheadschool", "hhheadmale", "land", "bpl", "media", "electricity"]
-
-    village = ["middle", "bank", "postoff", "lcurrpop"]
-
-    dist = ["busdist", "towndist", "railwaydist", "hqdist"]
-
-    sample_weights = ["village", "hhwt"]
-
-    all_vars = (
-        independent_variable
-        + regression_variables_1
-        + regression_variables_2
-        + demographics
-        + household
-        + village
-        + dist
-        + sample_weights
-    )
-
-    df_reg = df.loc[
-        (df["bihar"] == df["bihar"]) & (df["treat1"] == df["treat1"]), all_vars
-    ]
-
-    # TABLE 3 - COLUMN 1
-    reg_five_data = df_reg.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + regression_variables_2
-        + sample_weights,
-    ].dropna(how="any")
-
-    y = reg_five_data[independent_variable]
-    X = sm.add_constant(
-        reg_five_data.loc[:, regression_variables_1 + regression_variables_2]
-    )
-
-    reg_five = sm.WLS(y, X, weights=df_reg["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg["village"]}
-    )
-
-    # TABLE 3 - COLUMN 2
-
-    reg_six_data = df_reg.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + regression_variables_2
-        + demographics
-        + sample_weights,
-    ].dropna(how="any")
-
-    y = reg_six_data[independent_variable]
-    X = sm.add_constant(
-        reg_six_data.loc[
-            :, regression_variables_1 + regression_variables_2 + demographics
-        ]
-    )
-
-    reg_six = sm.WLS(y, X, weights=reg_six_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_six_data["village"]}
-    )
-
-    # TABLE 3 - COLUMN 3
-
-    reg_seven_data = df_reg.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + regression_variables_2
-        + demographics
-        + household
-        + sample_weights,
-    ].dropna(how="any")
-
-    y = reg_seven_data[independent_variable]
-    X = sm.add_constant(
-        reg_seven_data.loc[
-            :,
-            regression_variables_1 + regression_variables_2 + demographics + household,
-        ]
-    )
-
-    reg_seven = sm.WLS(y, X, weights=reg_seven_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_seven_data["village"]}
-    )
-
-    # TABLE 3 - COLUMN 4
-
-    reg_eight_data = df_reg.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + regression_variables_2
-        + demographics
-        + household
-        + sample_weights
-        + village
-        + dist,
-    ].dropna(how="any")
-
-    y = reg_eight_data[independent_variable]
-    X = sm.add_constant(
-        reg_eight_data.loc[
-            :,
-            regression_variables_1
-            + regression_variables_2
-            + demographics
-            + household
-            + village
-            + dist,
-        ]
-    )
-
-    reg_eight = sm.WLS(y, X, weights=reg_eight_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_eight_data["village"]}
+    # TABLE 3 - COLUMN 1 TO 4
+    reg_five, reg_six, reg_seven, reg_eight = fit_registered_specifications(
+        dlhs_reg_data, _TABLE_SPECIFICATIONS["table_3"]
     )
 
     ## Table creation with stargazer package
@@ -490,6 +508,87 @@ def table_3(dlhs_reg_data):
     return stargazer
 
 
+def _specification_data(dlhs_reg_data, spec, extra=()):
+    # the rows of a registered specification, with the outcome under its label
+    # and any extra columns
+    regressors = [column for block in spec.blocks for column in block]
+    variables = [spec.label] + regressors + [spec.weights, spec.groups]
+    df = _select_columns(
+        dlhs_reg_data,
+        variables + list(spec.sample) + list(extra),
+        rename={spec.outcome: spec.label},
+    )
+    df = df.loc[df[list(spec.sample)].notna().all(axis=1)]
+    return df.dropna(how="any", subset=variables), regressors
+
+
+def table_wild_bootstrap(
+    dlhs_reg_data,
+    table="table_2",
+    term="treat1_female_bihar",
+    replications=9999,
+    distribution="webb",
+    seed=0,
+):
+    # Wild cluster bootstrap p-values (clustered by village, imposing the
+    # null) of the DDD coefficient in every column of table 2 or table 3
+    tests = []
+    for spec in _TABLE_SPECIFICATIONS[table]:
+        df, regressors = _specification_data(dlhs_reg_data, spec)
+        tests.append(
+            wild_cluster_bootstrap(
+                df[spec.label],
+                sm.add_constant(df[regressors]),
+                df[spec.weights],
+                df[spec.groups],
+                term,
+                replications=replications,
+                distribution=distribution,
+                seed=seed,
+            )
+        )
+    tests = pd.DataFrame(tests, columns=tests[0]._fields)
+
+    return md(
+        "||||| \n"
+        "|:---|:---:|:---:|:---:|:---:| \n"
+        f"|<td colspan=5>Wild cluster bootstrap of {term} ({table})| \n"
+        "||(1)|(2)|(3)|(4)| \n"
+        + _markdown_row("Coefficient", tests["coefficient"])
+        + _markdown_row("Clustered standard error", tests["se"], "({})")
+        + _markdown_row("t statistic", tests["t_stat"])
+        + _markdown_row("Bootstrap p-value", tests["p_value"])
+        + f"<td colspan=5>Notes: {replications} replications with {distribution} "
+        "weights drawn per village, imposing a zero coefficient. \n"
+    )
+
+
+def table_2_permutation_test(
+    dlhs_reg_data, column=4, units="dist", permutations=10000, tol=0.005, seed=0
+):
+    # Randomization inference for the DDD coefficient of a column of table 2,
+    # reassigning the Bihar label across districts (units="dist") or the
+    # treated ages across the cohorts of the sample (units="age")
+    spec = _TABLE_SPECIFICATIONS["table_2"][column - 1]
+    df, regressors = _specification_data(dlhs_reg_data, spec, extra=[units])
+    if units == "age":
+        base, labels = df["female"] * df["bihar"], df["treat1"]
+    else:
+        base, labels = df["treat1"] * df["female"], df["bihar"]
+    return permutation_test(
+        df[spec.label],
+        sm.add_constant(df[regressors]),
+        df[spec.weights],
+        "treat1_female_bihar",
+        base,
+        labels,
+        df[units],
+        permutations=permutations,
+        tol=tol,
+        seed=seed,
+    )
+
+
 def gen_post(value):
     if value in [2009, 2010]:
         return 1
@@ -499,27 +598,47 @@ def gen_post(value):
         return np.nan
 
 
-def table_4(exam_data):
-    df = exam_data.copy()
-    df = df.loc[df["year"] != 2008].copy()
-    df["post"] = df["year"].apply(gen_post)
-    df_mean = df.groupby(["school_code", "statecode", "post", "gender", "statename"])[
-        ["appear_tot", "pass_tot", "district_code"]
-    ].apply(lambda x: x.mean(skipna=True))
-    df_mean.reset_index(inplace=True)
-    df_mean["treat"] = df_mean["statecode"].apply(lambda x: 1 if x == 1 else 0)
-    df_mean["male"] = df_mean["gender"].apply(lambda x: 1 if x == 1 else 0)
-    df_mean["female"] = df_mean["gender"].apply(lambda x: 1 if x == 2 else 0)
+def _exam_school_means(exam_data, gen_post):
+    # Mean exam totals per school, state, gender and pre/post period (as
+    # gen_post maps the years; other years are dropped), with the DDD
+    # regressors of tables 4 and 9. The group keys are categorical, so the
+    # means are one native grouped mean rather than a Python call per group
+    keys = ["school_code", "statecode", "post", "gender", "statename"]
+    post = {year: gen_post(year) for year in exam_data["year"].unique()}
+    df = exam_data.assign(post=exam_data["year"].map(post))
+    df = df.loc[df["post"].notna()]
+    df_mean = (
+        df.astype({key: "category" for key in keys})
+        .groupby(keys, observed=True)[["appear_tot", "pass_tot", "district_code"]]
+        .mean()
+        .reset_index()
+        .astype(df[keys].dtypes.to_dict())
+    )
+    df_mean["treat"] = (df_mean["statecode"] == 1).astype(int)
+    df_mean["male"] = (df_mean["gender"] == 1).astype(int)
+    df_mean["female"] = (df_mean["gender"] == 2).astype(int)
     df_mean["bh_post"] = df_mean["treat"] * df_mean["post"]
     df_mean["female_post"] = df_mean["female"] * df_mean["post"]
     df_mean["female_treat"] = df_mean["female"] * df_mean["treat"]
     df_mean["triple"] = df_mean["treat"] * df_mean["post"] * df_mean["female"]
     df_mean["lappear"] = np.log(df_mean["appear_tot"])
     df_mean["lpass"] = np.log(df_mean["pass_tot"])
-    df_1 = df_mean.copy()
-    gp = df_1.groupby(["school_code", "gender"])["lappear"]
-    df_1["sch_gender_prepost_appear"] = gp.transform(lambda x: np.isfinite(x).sum())
-    reg_df = df_1.loc[df_1["sch_gender_prepost_appear"] == 2]
+    return df_mean
+
+
+def _prepost_balanced(df_mean, column):
+    # the schools and genders with a finite column both before and after,
+    # counted with integer codes and bincount
+    school = pd.factorize(df_mean["school_code"])[0]
+    gender = pd.factorize(df_mean["gender"])[0]
+    codes = school * (gender.max() + 1) + gender
+    finite = np.bincount(codes, weights=np.isfinite(df_mean[column]))
+    return finite[codes] == 2
+
+
+def table_4(exam_data):
+    df_1 = _exam_school_means(exam_data, gen_post)
+    reg_df = df_1.loc[_prepost_balanced(df_1, "lappear")]
     X = sm.add_constant(
         reg_df.loc[
             :,
@@ -538,9 +657,7 @@ def table_4(exam_data):
     model = sm.OLS(y, X)
     res_1 = model.fit(cov_type="HC1")
 
-    gp = df_1.groupby(["school_code", "gender"])["lpass"]
-    df_1["sch_gender_prepost_pass"] = gp.transform(lambda x: np.isfinite(x).sum())
-    reg_df = df_1.loc[df_1["sch_gender_prepost_pass"] == 2]
+    reg_df = df_1.loc[_prepost_balanced(df_1, "lpass")]
     X = sm.add_constant(
         reg_df.loc[
             :,
@@ -560,7 +677,9 @@ def table_4(exam_data):
     res_2 = model.fit(cov_type="HC1")
 
     ## Table creation with stargazer package
-    stargazer = Stargazer([res_1, res_2])
+    stargazer = Stargazer(
+        [RegressionRecord.from_results(res_1), RegressionRecord.from_results(res_2)]
+    )
     stargazer.title(
         "Table 4 -- Impact on Exposure to the Cycle Program on Girls' Appearance in and Performance on Grade 10 Board Exams"
     )
@@ -611,764 +730,77 @@ def table_4(exam_data):
     return stargazer
 
 
-def table_6(dlhs_reg_data):
-    df = dlhs_reg_data.copy()
-    df.rename(
-        {"enrollment_secschool": "Enrolled in or completed grade 9"},
-        axis=1,
-        inplace=True,
+def table_6(dlhs_reg_data, max_workers=None):
+    # the 24 fits of the three panels, in the order of the markdown rows
+    (
+        reg_one,
+        reg_two,
+        reg_three,
+        reg_four,
+        reg_five,
+        reg_six,
+        reg_seven,
+        reg_eight,
+        reg_nine,
+        reg_ten,
+        reg_eleven,
+        reg_twelve,
+        reg_thirteen,
+        reg_fourteen,
+        reg_fifteen,
+        reg_sixteen,
+        reg_seventeen,
+        reg_eighteen,
+        reg_nineteen,
+        reg_twenty,
+        reg_twenone,
+        reg_twentwo,
+        reg_twenthree,
+        reg_twenfour,
+    ) = fit_registered_specifications(
+        dlhs_reg_data, _TABLE_SPECIFICATIONS["table_6"], max_workers=max_workers
     )
 
-    # regression 2 data
-    independent_variable = ["Enrolled in or completed grade 9"]
+    table_6_str = md(
+        "|||||| \n"
+        "|:---|:---:|:---:|:---:|:---:| \n"
+        "|<td colspan=5>Dependent variable: Enrolled in or completed grade 9| \n"
+        "||(1)|(2)|(3)|(4)| \n"
+        "|*Panel A. Treatment = 13, 14, 15; control = 16, 17*||||| \n"
+        f"|Treat × female × Bihar|{round(reg_one.params['treat2_female_bihar'], 3)}|{round(reg_two.params['treat2_female_bihar'], 3)}|{round(reg_three.params['treat2_female_bihar'], 3)}|{round(reg_four.params['treat2_female_bihar'], 3)}| \n"
+        f"||({round(reg_one.bse['treat2_female_bihar'], 3)})|({round(reg_two.bse['treat2_female_bihar'], 3)})|({round(reg_three.bse['treat2_female_bihar'], 3)})|({round(reg_four.bse['treat2_female_bihar'], 3)})| \n"
+        f"|Treat × female × Bihar × long distance indicator|{round(reg_five.params['treat2_female_bihar_longdist'], 3)}|{round(reg_six.params['treat2_female_bihar_longdist'], 3)}|{round(reg_seven.params['treat2_female_bihar_longdist'], 3)}|{round(reg_eight.params['treat2_female_bihar_longdist'], 3)}| \n"
+        f"||({round(reg_five.bse['treat2_female_bihar_longdist'], 3)})|({round(reg_six.bse['treat2_female_bihar_longdist'], 3)})|({round(reg_seven.bse['treat2_female_bihar_longdist'], 3)})|({round(reg_eight.bse['treat2_female_bihar_longdist'], 3)})| \n"
+        f"|Observations|{int(reg_five.nobs)}|{int(reg_six.nobs)}|{int(reg_seven.nobs)}|{int(reg_eight.nobs)}| \n"
+        "|*Panel B. Treatment = 14, 15; control = 16*||||| \n"
+        f"|Treat × female × Bihar|{round(reg_nine.params['treat3_female_bihar'], 3)}|{round(reg_ten.params['treat3_female_bihar'], 3)}|{round(reg_eleven.params['treat3_female_bihar'], 3)}|{round(reg_twelve.params['treat3_female_bihar'], 3)}| \n"
+        f"||({round(reg_nine.bse['treat3_female_bihar'], 3)})|({round(reg_ten.bse['treat3_female_bihar'], 3)})|({round(reg_eleven.bse['treat3_female_bihar'], 3)})|({round(reg_twelve.bse['treat3_female_bihar'], 3)})| \n"
+        f"|Treat × female × Bihar × long distance indicator|{round(reg_thirteen.params['treat3_female_bihar_longdist'], 3)}|{round(reg_fourteen.params['treat3_female_bihar_longdist'], 3)}|{round(reg_fifteen.params['treat3_female_bihar_longdist'], 3)}|{round(reg_sixteen.params['treat3_female_bihar_longdist'], 3)}| \n"
+        f"||({round(reg_thirteen.bse['treat3_female_bihar_longdist'], 3)})|({round(reg_fourteen.bse['treat3_female_bihar_longdist'], 3)})|({round(reg_fifteen.bse['treat3_female_bihar_longdist'], 3)})|({round(reg_sixteen.bse['treat3_female_bihar_longdist'], 3)})| \n"
+        f"|Observations|{int(reg_nine.nobs)}|{int(reg_ten.nobs)}|{int(reg_eleven.nobs)}|{int(reg_twelve.nobs)}| \n"
+        "|*Panel C. Treatment = 13, 14, 15; control = 16*||||| \n"
+        f"|Treat × female × Bihar|{round(reg_seventeen.params['treat4_female_bihar'], 3)}|{round(reg_eighteen.params['treat4_female_bihar'], 3)}|{round(reg_nineteen.params['treat4_female_bihar'], 3)}|{round(reg_twenty.params['treat4_female_bihar'], 3)}| \n"
+        f"||({round(reg_seventeen.bse['treat4_female_bihar'], 3)})|({round(reg_eighteen.bse['treat4_female_bihar'], 3)})|({round(reg_nineteen.bse['treat4_female_bihar'], 3)})|({round(reg_twenty.bse['treat4_female_bihar'], 3)})| \n"
+        f"|Treat × female × Bihar × long distance indicator|{round(reg_twenone.params['treat4_female_bihar_longdist'], 3)}|{round(reg_twentwo.params['treat4_female_bihar_longdist'], 3)}|{round(reg_twenthree.params['treat4_female_bihar_longdist'], 3)}|{round(reg_twenfour.params['treat4_female_bihar_longdist'], 3)}| \n"
+        f"||({round(reg_twenone.bse['treat4_female_bihar_longdist'], 3)})|({round(reg_twentwo.bse['treat4_female_bihar_longdist'], 3)})|({round(reg_twenthree.bse['treat4_female_bihar_longdist'], 3)})|({round(reg_twenfour.bse['treat4_female_bihar_longdist'], 3)})| \n"
+        f"|Observations|{int(reg_seventeen.nobs)}|{int(reg_eighteen.nobs)}|{int(reg_nineteen.nobs)}|{int(reg_twenty.nobs)}| \n"
+        "|Demographic controls|No|Yes|Yes|Yes| \n"
+        "|HH socioeconomic controls|No|No|Yes|Yes| \n"
+        "|Village level controls|No|No|No|Yes| \n"
+        "<td colspan=5>Notes: The first row in each panel presents the triple difference coefficients analogous to the"
+        + "first row in Table 2 but  with  different  cohorts  in  the  estimation  sample  and  different  definitions"
+        + "of  treatment  and  control  cohorts  (as indicated in the panel title). The second row in each panel presents"
+        + "the quadruple difference coefficients analogous to the first row in Table 3 with the same modified definitions "
+        + "of treatment and control cohorts. The controls in the four columns are identical to those in Tables 2 and 3. "
+        + "Standard errors, clustered by village ID, are in parentheses. \n"
+    )
 
-    regression_variables_1 = [
-        "treat2_female_bihar",
-        "treat2_female",
-        "treat2_bihar",
-        "female_bihar",
-        "treat2",
-        "female",
-        "bihar",
-    ]
+    return table_6_str
 
-    regression_variables_2 = [
-        "treat2_female_bihar_longdist",
-        "treat2_female_longdist",
-        "female_bihar_longdist",
-        "treat2_bihar_longdist",
-        "treat2_longdist",
-        "female_longdist",
-        "bihar_longdist",
-        "longdist",
-    ]
 
-    regression_variables_3 = [
-        "treat3_female_bihar",
-        "treat3_female",
-        "treat3_bihar",
-        "treat3",
-    ]
-
-    regression_variables_4 = [
-        "treat3_female_bihar_longdist",
-        "treat3_female_longdist",
-        "treat3_bihar_longdist",
-        "treat3_longdist",
-    ]
-
-    regression_variables_5 = [
-        "treat4_female_bihar",
-        "treat4_female",
-        "treat4_bihar",
-        "treat4",
-    ]
-
-    regression_variables_6 = [
-        "treat4_female_bihar_longdist",
-        "treat4_female_longdist",
-        "treat4_bihar_longdist",
-        "treat4_longdist",
-    ]
-
-    demographics = ["sc", "st", "obc", "hindu", "muslim"]
-
-    household = ["hhheadschool", "hhheadmale", "land", "bpl", "media", "electricity"]
-
-    village = ["middle", "bank", "postoff", "lcurrpop"]
-
-    dist = ["busdist", "towndist", "railwaydist", "hqdist"]
-
-    sample_weights = ["village", "hhwt"]
-
-    all_vars = (
-        independent_variable
-        + regression_variables_1
-        + regression_variables_2
-        + regression_variables_3
-        + regression_variables_4
-        + regression_variables_5
-        + regression_variables_6
-        + demographics
-        + household
-        + village
-        + dist
-        + sample_weights
-    )
-
-    df_reg = df.loc[
-        (df["bihar"] == df["bihar"]) & (df["treat2"] == df["treat2"]), all_vars
-    ]
-    df_reg_2 = df.loc[
-        (df["bihar"] == df["bihar"]) & (df["treat3"] == df["treat3"]),
-        all_vars,
-    ]
-    df_reg_3 = df.loc[
-        (df["bihar"] == df["bihar"]) & (df["treat4"] == df["treat4"]), all_vars
-    ]
-
-    # * Triple Difference (w.r.t. Jharkhand) *
-    ## * The treatment group is 13, 14 and 15 while the control group is 16 and 17 *
-
-    ## * TABLE 6 - PANEL A - ROW - 1 *
-    # COLUMN 1
-
-    y = df_reg.loc[:, independent_variable]
-    X = sm.add_constant(df_reg.loc[:, regression_variables_1])
-
-    reg_one = sm.WLS(y, X, weights=df_reg["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg["village"]}
-    )
-
-    # COLUMN 2
-
-    X = sm.add_constant(df_reg.loc[:, regression_variables_1 + demographics])
-
-    reg_two = sm.WLS(y, X, weights=df_reg["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg["village"]}
-    )
-
-    # COLUMN 3
-
-    reg_three_data = df_reg.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + demographics
-        + household
-        + sample_weights,
-    ].dropna(how="any")
-
-    y = reg_three_data[independent_variable]
-    X = sm.add_constant(
-        reg_three_data.loc[:, regression_variables_1 + demographics + household]
-    )
-
-    reg_three = sm.WLS(y, X, weights=reg_three_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_three_data["village"]}
-    )
-
-    # COLUMN 4
-
-    reg_four_data = df_reg.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + demographics
-        + household
-        + sample_weights
-        + village
-        + dist,
-    ].dropna(how="any")
-
-    y = reg_four_data[independent_variable]
-    X = sm.add_constant(
-        reg_four_data.loc[
-            :, regression_variables_1 + demographics + household + village + dist
-        ]
-    )
-
-    reg_four = sm.WLS(y, X, weights=reg_four_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_four_data["village"]}
-    )
-
-    # * Quadruple-Difference (w.r.t. Jharkhand and Distance)*
-    # * The treatment group is 13, 14 and 15 while the control group is 16 and 17- long-distance dummy (greater than 3km) *
-    # * TABLE 6 - PANEL A - ROW - 2 *
-
-    # COLUMN 1
-    reg_five_data = df_reg.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + regression_variables_2
-        + sample_weights,
-    ].dropna(how="any")
-
-    y = reg_five_data[independent_variable]
-    X = sm.add_constant(
-        reg_five_data.loc[:, regression_variables_1 + regression_variables_2]
-    )
-
-    reg_five = sm.WLS(y, X, weights=df_reg["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg["village"]}
-    )
-
-    # COLUMN 2
-
-    reg_six_data = df_reg.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + regression_variables_2
-        + demographics
-        + sample_weights,
-    ].dropna(how="any")
-
-    y = reg_six_data[independent_variable]
-    X = sm.add_constant(
-        reg_six_data.loc[
-            :, regression_variables_1 + regression_variables_2 + demographics
-        ]
-    )
-
-    reg_six = sm.WLS(y, X, weights=reg_six_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_six_data["village"]}
-    )
-
-    # COLUMN 3
-
-    reg_seven_data = df_reg.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + regression_variables_2
-        + demographics
-        + household
-        + sample_weights,
-    ].dropna(how="any")
-
-    y = reg_seven_data[independent_variable]
-    X = sm.add_constant(
-        reg_seven_data.loc[
-            :,
-            regression_variables_1 + regression_variables_2 + demographics + household,
-        ]
-    )
-
-    reg_seven = sm.WLS(y, X, weights=reg_seven_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_seven_data["village"]}
-    )
-
-    # COLUMN 4
-
-    reg_eight_data = df_reg.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + regression_variables_2
-        + demographics
-        + household
-        + sample_weights
-        + village
-        + dist,
-    ].dropna(how="any")
-
-    y = reg_eight_data[independent_variable]
-    X = sm.add_constant(
-        reg_eight_data.loc[
-            :,
-            regression_variables_1
-            + regression_variables_2
-            + demographics
-            + household
-            + village
-            + dist,
-        ]
-    )
-
-    reg_eight = sm.WLS(y, X, weights=reg_eight_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_eight_data["village"]}
-    )
-
-    # * Table 6 - PANEL - B - ROW - 1 *
-    # * Triple Difference (w.r.t. Jharkhand) *
-    # * The treatment group is 14 and 15 while the control group is 16 *
-
-    # COLUMN 1
-    y = df_reg_2.loc[:, independent_variable]
-    X = sm.add_constant(
-        df_reg_2.loc[:, regression_variables_3 + ["female_bihar", "bihar", "female"]]
-    )
-    reg_nine = sm.WLS(y, X, weights=df_reg_2["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg_2["village"]}
-    )
-
-    # COLUMN 2
-
-    X = sm.add_constant(
-        df_reg_2.loc[
-            :,
-            regression_variables_3 + demographics + ["female_bihar", "bihar", "female"],
-        ]
-    )
-
-    reg_ten = sm.WLS(y, X, weights=df_reg_2["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg_2["village"]}
-    )
-
-    # COLUMN 3
-
-    reg_eleven_data = df_reg_2.loc[
-        :,
-        independent_variable
-        + regression_variables_3
-        + demographics
-        + household
-        + sample_weights
-        + ["female_bihar", "bihar", "female"],
-    ].dropna(how="any")
-
-    y = reg_eleven_data[independent_variable]
-    X = sm.add_constant(
-        reg_eleven_data.loc[
-            :,
-            regression_variables_3
-            + demographics
-            + household
-            + ["female_bihar", "bihar", "female"],
-        ]
-    )
-
-    reg_eleven = sm.WLS(y, X, weights=reg_eleven_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_eleven_data["village"]}
-    )
-
-    # COLUMN 4
-
-    reg_twelve_data = df_reg_2.loc[
-        :,
-        independent_variable
-        + regression_variables_3
-        + demographics
-        + household
-        + sample_weights
-        + village
-        + dist
-        + ["female_bihar", "bihar", "female"],
-    ].dropna(how="any")
-
-    y = reg_twelve_data[independent_variable]
-    X = sm.add_constant(
-        reg_twelve_data.loc[
-            :,
-            regression_variables_3
-            + demographics
-            + household
-            + village
-            + dist
-            + ["female_bihar", "bihar", "female"],
-        ]
-    )
-
-    reg_twelve = sm.WLS(y, X, weights=reg_twelve_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_twelve_data["village"]}
-    )
-
-    # * Table 6 - PANEL - B - ROW - 2 *
-    # * Quadruple-Difference (w.r.t. Jharkhand and Distance)*
-    # * The treatment group is 14 and 15 while the control group is 16 - long-distance dummy (greater than 3km) *
-
-    # COLUMN 1
-    y = df_reg_2.loc[:, independent_variable]
-    X = sm.add_constant(
-        df_reg_2.loc[
-            :,
-            regression_variables_3
-            + regression_variables_4
-            + [
-                "female_bihar",
-                "bihar",
-                "female",
-                "longdist",
-                "bihar_longdist",
-                "female_longdist",
-                "female_bihar_longdist",
-            ],
-        ]
-    )
-    reg_thirteen = sm.WLS(y, X, weights=df_reg_2["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg_2["village"]}
-    )
-
-    # COLUMN 2
-
-    X = sm.add_constant(
-        df_reg_2.loc[
-            :,
-            regression_variables_3
-            + regression_variables_4
-            + [
-                "female_bihar",
-                "bihar",
-                "female",
-                "longdist",
-                "bihar_longdist",
-                "female_longdist",
-                "female_bihar_longdist",
-            ]
-            + demographics,
-        ]
-    )
-
-    reg_fourteen = sm.WLS(y, X, weights=df_reg_2["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg_2["village"]}
-    )
-
-    # COLUMN 3
-
-    reg_fifteen_data = df_reg_2.loc[
-        :,
-        independent_variable
-        + regression_variables_3
-        + regression_variables_4
-        + demographics
-        + household
-        + sample_weights
-        + [
-            "female_bihar",
-            "bihar",
-            "female",
-            "longdist",
-            "bihar_longdist",
-            "female_longdist",
-            "female_bihar_longdist",
-        ],
-    ].dropna(how="any")
-
-    y = reg_fifteen_data[independent_variable]
-    X = sm.add_constant(
-        reg_fifteen_data.loc[
-            :,
-            regression_variables_3
-            + regression_variables_4
-            + demographics
-            + household
-            + [
-                "female_bihar",
-                "bihar",
-                "female",
-                "longdist",
-                "bihar_longdist",
-                "female_longdist",
-                "female_bihar_longdist",
-            ],
-        ]
-    )
-
-    reg_fifteen = sm.WLS(y, X, weights=reg_fifteen_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_fifteen_data["village"]}
-    )
-
-    # COLUMN 4
-
-    reg_sixteen_data = df_reg_2.loc[
-        :,
-        independent_variable
-        + regression_variables_3
-        + regression_variables_4
-        + demographics
-        + household
-        + sample_weights
-        + village
-        + dist
-        + [
-            "female_bihar",
-            "bihar",
-            "female",
-            "longdist",
-            "bihar_longdist",
-            "female_longdist",
-            "female_bihar_longdist",
-        ],
-    ].dropna(how="any")
-
-    y = reg_sixteen_data[independent_variable]
-    X = sm.add_constant(
-        reg_sixteen_data.loc[
-            :,
-            regression_variables_3
-            + regression_variables_4
-            + demographics
-            + household
-            + village
-            + dist
-            + [
-                "female_bihar",
-                "bihar",
-                "female",
-                "longdist",
-                "bihar_longdist",
-                "female_longdist",
-                "female_bihar_longdist",
-            ],
-        ]
-    )
-    reg_sixteen = sm.WLS(y, X, weights=reg_sixteen_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_sixteen_data["village"]}
-    )
-
-    # * TABLE - 6 - PANEL - C - ROW - 1 *
-    # * Triple Difference (w.r.t. Jharkhand) *
-    # * The treatment group is 13, 14 and 15 while the control group is 16 *
-
-    # COLUMN 1
-
-    y = df_reg_3.loc[:, independent_variable]
-    X = sm.add_constant(
-        df_reg_3.loc[:, regression_variables_5 + ["female_bihar", "bihar", "female"]]
-    )
-    reg_seventeen = sm.WLS(y, X, weights=df_reg_3["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg_3["village"]}
-    )
-
-    # COLUMN 2
-
-    X = sm.add_constant(
-        df_reg_3.loc[
-            :,
-            regression_variables_5 + demographics + ["female_bihar", "bihar", "female"],
-        ]
-    )
-
-    reg_eighteen = sm.WLS(y, X, weights=df_reg_3["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg_3["village"]}
-    )
-
-    # COLUMN 3
-
-    reg_nineteen_data = df_reg_3.loc[
-        :,
-        independent_variable
-        + regression_variables_5
-        + demographics
-        + household
-        + sample_weights
-        + ["female_bihar", "bihar", "female"],
-    ].dropna(how="any")
-
-    y = reg_nineteen_data[independent_variable]
-    X = sm.add_constant(
-        reg_nineteen_data.loc[
-            :,
-            regression_variables_5
-            + demographics
-            + household
-            + ["female_bihar", "bihar", "female"],
-        ]
-    )
-
-    reg_nineteen = sm.WLS(y, X, weights=reg_nineteen_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_nineteen_data["village"]}
-    )
-
-    # COLUMN 4
-
-    reg_twenty_data = df_reg_3.loc[
-        :,
-        independent_variable
-        + regression_variables_5
-        + demographics
-        + household
-        + sample_weights
-        + village
-        + dist
-        + ["female_bihar", "bihar", "female"],
-    ].dropna(how="any")
-
-    y = reg_twenty_data[independent_variable]
-    X = sm.add_constant(
-        reg_twenty_data.loc[
-            :,
-            regression_variables_5
-            + demographics
-            + household
-            + village
-            + dist
-            + ["female_bihar", "bihar", "female"],
-        ]
-    )
-
-    reg_twenty = sm.WLS(y, X, weights=reg_twenty_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_twenty_data["village"]}
-    )
-
-    # * TABLE - 6 - PANEL - C - ROW - 2 *
-    # * Quadruple-Difference (w.r.t. Jharkhand and Distance)*
-    # * The treatment group is 13, 14 and 15 while the control group is 16 - long-distance dummy (greater than 3km) *
-
-    # COLUMN 1
-    y = df_reg_3.loc[:, independent_variable]
-    X = sm.add_constant(
-        df_reg_3.loc[
-            :,
-            regression_variables_5
-            + regression_variables_6
-            + [
-                "female_bihar",
-                "bihar",
-                "female",
-                "longdist",
-                "bihar_longdist",
-                "female_longdist",
-                "female_bihar_longdist",
-            ],
-        ]
-    )
-    reg_twenone = sm.WLS(y, X, weights=df_reg_3["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg_3["village"]}
-    )
-
-    # COLUMN 2
-
-    X = sm.add_constant(
-        df_reg_3.loc[
-            :,
-            regression_variables_5
-            + regression_variables_6
-            + [
-                "female_bihar",
-                "bihar",
-                "female",
-                "longdist",
-                "bihar_longdist",
-                "female_longdist",
-                "female_bihar_longdist",
-            ]
-            + demographics,
-        ]
-    )
-
-    reg_twentwo = sm.WLS(y, X, weights=df_reg_3["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_reg_3["village"]}
-    )
-
-    # COLUMN 3
-
-    reg_twenthree_data = df_reg_3.loc[
-        :,
-        independent_variable
-        + regression_variables_5
-        + regression_variables_6
-        + demographics
-        + household
-        + sample_weights
-        + [
-            "female_bihar",
-            "bihar",
-            "female",
-            "longdist",
-            "bihar_longdist",
-            "female_longdist",
-            "female_bihar_longdist",
-        ],
-    ].dropna(how="any")
-
-    y = reg_twenthree_data[independent_variable]
-    X = sm.add_constant(
-        reg_twenthree_data.loc[
-            :,
-            regression_variables_5
-            + regression_variables_6
-            + demographics
-            + household
-            + [
-                "female_bihar",
-                "bihar",
-                "female",
-                "longdist",
-                "bihar_longdist",
-                "female_longdist",
-                "female_bihar_longdist",
-            ],
-        ]
-    )
-
-    reg_twenthree = sm.WLS(y, X, weights=reg_twenthree_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_twenthree_data["village"]}
-    )
-
-    # COLUMN 4
-
-    reg_twenfour_data = df_reg_3.loc[
-        :,
-        independent_variable
-        + regression_variables_5
-        + regression_variables_6
-        + demographics
-        + household
-        + sample_weights
-        + village
-        + dist
-        + [
-            "female_bihar",
-            "bihar",
-            "female",
-            "longdist",
-            "bihar_longdist",
-            "female_longdist",
-            "female_bihar_longdist",
-        ],
-    ].dropna(how="any")
-
-    y = reg_twenfour_data[independent_variable]
-    X = sm.add_constant(
-        reg_twenfour_data.loc[
-            :,
-            regression_variables_5
-            + regression_variables_6
-            + demographics
-            + household
-            + village
-            + dist
-            + [
-                "female_bihar",
-                "bihar",
-                "female",
-                "longdist",
-                "bihar_longdist",
-                "female_longdist",
-                "female_bihar_longdist",
-            ],
-        ]
-    )
-    reg_twenfour = sm.WLS(y, X, weights=reg_twenfour_data["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_twenfour_data["village"]}
-    )
-
-    table_6_str = md(
-        "|||||| \n"
-        "|:---|:---:|:---:|:---:|:---:| \n"
-        "|<td colspan=5>Dependent variable: Enrolled in or completed grade 9| \n"
-        "||(1)|(2)|(3)|(4)| \n"
-        "|*Panel A. Treatment = 13, 14, 15; control = 16, 17*||||| \n"
-        f"|Treat × female × Bihar|{round(reg_one.params['treat2_female_bihar'], 3)}|{round(reg_two.params['treat2_female_bihar'], 3)}|{round(reg_three.params['treat2_female_bihar'], 3)}|{round(reg_four.params['treat2_female_bihar'], 3)}| \n"
-        f"||({round(reg_one.bse['treat2_female_bihar'], 3)})|({round(reg_two.bse['treat2_female_bihar'], 3)})|({round(reg_three.bse['treat2_female_bihar'], 3)})|({round(reg_four.bse['treat2_female_bihar'], 3)})| \n"
-        f"|Treat × female × Bihar × long distance indicator|{round(reg_five.params['treat2_female_bihar_longdist'], 3)}|{round(reg_six.params['treat2_female_bihar_longdist'], 3)}|{round(reg_seven.params['treat2_female_bihar_longdist'], 3)}|{round(reg_eight.params['treat2_female_bihar_longdist'], 3)}| \n"
-        f"||({round(reg_five.bse['treat2_female_bihar_longdist'], 3)})|({round(reg_six.bse['treat2_female_bihar_longdist'], 3)})|({round(reg_seven.bse['treat2_female_bihar_longdist'], 3)})|({round(reg_eight.bse['treat2_female_bihar_longdist'], 3)})| \n"
-        f"|Observations|{int(reg_five.nobs)}|{int(reg_six.nobs)}|{int(reg_seven.nobs)}|{int(reg_eight.nobs)}| \n"
-        "|*Panel B. Treatment = 14, 15; control = 16*||||| \n"
-        f"|Treat × female × Bihar|{round(reg_nine.params['treat3_female_bihar'], 3)}|{round(reg_ten.params['treat3_female_bihar'], 3)}|{round(reg_eleven.params['treat3_female_bihar'], 3)}|{round(reg_twelve.params['treat3_female_bihar'], 3)}| \n"
-        f"||({round(reg_nine.bse['treat3_female_bihar'], 3)})|({round(reg_ten.bse['treat3_female_bihar'], 3)})|({round(reg_eleven.bse['treat3_female_bihar'], 3)})|({round(reg_twelve.bse['treat3_female_bihar'], 3)})| \n"
-        f"|Treat × female × Bihar × long distance indicator|{round(reg_thirteen.params['treat3_female_bihar_longdist'], 3)}|{round(reg_fourteen.params['treat3_female_bihar_longdist'], 3)}|{round(reg_fifteen.params['treat3_female_bihar_longdist'], 3)}|{round(reg_sixteen.params['treat3_female_bihar_longdist'], 3)}| \n"
-        f"||({round(reg_thirteen.bse['treat3_female_bihar_longdist'], 3)})|({round(reg_fourteen.bse['treat3_female_bihar_longdist'], 3)})|({round(reg_fifteen.bse['treat3_female_bihar_longdist'], 3)})|({round(reg_sixteen.bse['treat3_female_bihar_longdist'], 3)})| \n"
-        f"|Observations|{int(reg_nine.nobs)}|{int(reg_ten.nobs)}|{int(reg_eleven.nobs)}|{int(reg_twelve.nobs)}| \n"
-        "|*Panel C. Treatment = 13, 14, 15; control = 16*||||| \n"
-        f"|Treat × female × Bihar|{round(reg_seventeen.params['treat4_female_bihar'], 3)}|{round(reg_eighteen.params['treat4_female_bihar'], 3)}|{round(reg_nineteen.params['treat4_female_bihar'], 3)}|{round(reg_twenty.params['treat4_female_bihar'], 3)}| \n"
-        f"||({round(reg_seventeen.bse['treat4_female_bihar'], 3)})|({round(reg_eighteen.bse['treat4_female_bihar'], 3)})|({round(reg_nineteen.bse['treat4_female_bihar'], 3)})|({round(reg_twenty.bse['treat4_female_bihar'], 3)})| \n"
-        f"|Treat × female × Bihar × long distance indicator|{round(reg_twenone.params['treat4_female_bihar_longdist'], 3)}|{round(reg_twentwo.params['treat4_female_bihar_longdist'], 3)}|{round(reg_twenthree.params['treat4_female_bihar_longdist'], 3)}|{round(reg_twenfour.params['treat4_female_bihar_longdist'], 3)}| \n"
-        f"||({round(reg_twenone.bse['treat4_female_bihar_longdist'], 3)})|({round(reg_twentwo.bse['treat4_female_bihar_longdist'], 3)})|({round(reg_twenthree.bse['treat4_female_bihar_longdist'], 3)})|({round(reg_twenfour.bse['treat4_female_bihar_longdist'], 3)})| \n"
-        f"|Observations|{int(reg_seventeen.nobs)}|{int(reg_eighteen.nobs)}|{int(reg_nineteen.nobs)}|{int(reg_twenty.nobs)}| \n"
-        "|Demographic controls|No|Yes|Yes|Yes| \n"
-        "|HH socioeconomic controls|No|No|Yes|Yes| \n"
-        "|Village level controls|No|No|No|Yes| \n"
-        "<td colspan=5>Notes: The first row in each panel presents the triple difference coefficients analogous to the"
-        + "first row in Table 2 but  with  different  cohorts  in  the  estimation  sample  and  different  definitions"
-        + "of  treatment  and  control  cohorts  (as indicated in the panel title). The second row in each panel presents"
-        + "the quadruple difference coefficients analogous to the first row in Table 3 with the same modified definitions "
-        + "of treatment and control cohorts. The controls in the four columns are identical to those in Tables 2 and 3. "
-        + "Standard errors, clustered by village ID, are in parentheses. \n"
-    )
-
-    return table_6_str
-
-
-def table_7(dlhs_reg_data):
-    df = dlhs_reg_data.copy()
-    df = df.loc[np.isfinite(df["bihar"])]
-
-    demographics = ["sc", "st", "obc", "hindu", "muslim"]
-    household = ["hhheadschool", "hhheadmale", "land", "bpl", "media", "electricity"]
+def table_7(dlhs_reg_data):
+    demographics = ["sc", "st", "obc", "hindu", "muslim"]
+    household = ["hhheadschool", "hhheadmale", "land", "bpl", "media", "electricity"]
 
     village = ["middle", "bank", "postoff", "lcurrpop"]
 
@@ -1385,387 +817,63 @@ def table_7(dlhs_reg_data):
         + ["enrollment_secschool", "female", "female_bihar", "bihar"]
     )
 
-    df_1 = df.loc[(df["bihar"] == 1) & (df["age"] == 13), all_vars]
-    df_2 = df.loc[(df["bihar"] == 1) & (df["age"] == 14), all_vars]
-    df_3 = df.loc[(df["bihar"] == 1) & (df["age"] == 15), all_vars]
-    df_4 = df.loc[(df["bihar"] == 1) & (df["age"] == 16), all_vars]
-    df_5 = df.loc[(df["bihar"] == 1) & (df["age"] == 17), all_vars]
-
-    df_6 = df.loc[(df["bihar"] == 0) & (df["age"] == 13), all_vars]
-    df_7 = df.loc[(df["bihar"] == 0) & (df["age"] == 14), all_vars]
-    df_8 = df.loc[(df["bihar"] == 0) & (df["age"] == 15), all_vars]
-    df_9 = df.loc[(df["bihar"] == 0) & (df["age"] == 16), all_vars]
-    df_10 = df.loc[(df["bihar"] == 0) & (df["age"] == 17), all_vars]
-
-    df_11 = df.loc[(df["age"] == 13), all_vars]
-    df_12 = df.loc[(df["age"] == 14), all_vars]
-    df_13 = df.loc[(df["age"] == 15), all_vars]
-    df_14 = df.loc[(df["age"] == 16), all_vars]
-    df_15 = df.loc[(df["age"] == 17), all_vars]
-
-    df_16 = df.loc[(df["age"] == 13) & (df["longdist"] == 1), all_vars]
-    df_17 = df.loc[(df["age"] == 14) & (df["longdist"] == 1), all_vars]
-    df_18 = df.loc[(df["age"] == 15) & (df["longdist"] == 1), all_vars]
-    df_19 = df.loc[(df["age"] == 16) & (df["longdist"] == 1), all_vars]
-    df_20 = df.loc[(df["age"] == 17) & (df["longdist"] == 1), all_vars]
-
-    ## Finding averages
-    # PANEL A
-
-    df_21 = df.loc[
-        (df["age"] == 13) & (df["bihar"] == 1) & (df["female"] == 0), all_vars
-    ]
-    df_22 = df.loc[
-        (df["age"] == 14) & (df["bihar"] == 1) & (df["female"] == 0), all_vars
-    ]
-    df_23 = df.loc[
-        (df["age"] == 15) & (df["bihar"] == 1) & (df["female"] == 0), all_vars
-    ]
-    df_24 = df.loc[
-        (df["age"] == 16) & (df["bihar"] == 1) & (df["female"] == 0), all_vars
-    ]
-    df_25 = df.loc[
-        (df["age"] == 17) & (df["bihar"] == 1) & (df["female"] == 0), all_vars
-    ]
-
-    ## Finding averages
-    # PANEL B
-
-    df_26 = df.loc[
-        (df["age"] == 13) & (df["bihar"] == 0) & (df["female"] == 0), all_vars
-    ]
-    df_27 = df.loc[
-        (df["age"] == 14) & (df["bihar"] == 0) & (df["female"] == 0), all_vars
-    ]
-    df_28 = df.loc[
-        (df["age"] == 15) & (df["bihar"] == 0) & (df["female"] == 0), all_vars
-    ]
-    df_29 = df.loc[
-        (df["age"] == 16) & (df["bihar"] == 0) & (df["female"] == 0), all_vars
-    ]
-    df_30 = df.loc[
-        (df["age"] == 17) & (df["bihar"] == 0) & (df["female"] == 0), all_vars
-    ]
-
-    # TABLE 7 - PANEL A
-
-    reg_t7_1 = df_1.dropna(how="any")
-
-    y = reg_t7_1["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_1.loc[:, ["female"] + demographics + household + village + dist]
-    )
-
-    reg_one = sm.WLS(y, X, weights=reg_t7_1["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_1["village"]}
-    )
-
-    reg_t7_2 = df_2.dropna(how="any")
-
-    y = reg_t7_2["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_2.loc[:, ["female"] + demographics + household + village + dist]
-    )
-
-    reg_two = sm.WLS(y, X, weights=reg_t7_2["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_2["village"]}
-    )
-
-    reg_t7_3 = df_3.dropna(how="any")
-
-    y = reg_t7_3["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_3.loc[:, ["female"] + demographics + household + village + dist]
-    )
-
-    reg_three = sm.WLS(y, X, weights=reg_t7_3["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_3["village"]}
-    )
-
-    reg_t7_4 = df_4.dropna(how="any")
-
-    y = reg_t7_4["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_4.loc[:, ["female"] + demographics + household + village + dist]
-    )
-
-    reg_four = sm.WLS(y, X, weights=reg_t7_4["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_4["village"]}
-    )
-
-    reg_t7_5 = df_5.dropna(how="any")
-
-    y = reg_t7_5["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_5.loc[:, ["female"] + demographics + household + village + dist]
-    )
-
-    reg_five = sm.WLS(y, X, weights=reg_t7_5["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_5["village"]}
-    )
-
-    # * WE START WITH SINGLE DIFFERENCE IN JHARKHAND, I.E. GIRLS VS. BOYS. WE RUN SEPERATE REGRESSION FOR AGE 13 THOUGH 17 *
-
-    # * SINGLE DIFFERENCE W.R.T BOYS IN JHARKHAND *
-    # * TABLE 7 - PANEL - B *
-
-    reg_t7_6 = df_6.dropna(how="any")
-
-    y = reg_t7_6["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_6.loc[:, ["female"] + demographics + household + village + dist]
-    )
-
-    reg_six = sm.WLS(y, X, weights=reg_t7_6["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_6["village"]}
-    )
-
-    reg_t7_7 = df_7.dropna(how="any")
-
-    y = reg_t7_7["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_7.loc[:, ["female"] + demographics + household + village + dist]
-    )
-
-    reg_seven = sm.WLS(y, X, weights=reg_t7_7["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_7["village"]}
-    )
-
-    reg_t7_8 = df_8.dropna(how="any")
-
-    y = reg_t7_8["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_8.loc[:, ["female"] + demographics + household + village + dist]
-    )
-
-    reg_eight = sm.WLS(y, X, weights=reg_t7_8["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_8["village"]}
-    )
-
-    reg_t7_9 = df_9.dropna(how="any")
-
-    y = reg_t7_9["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_9.loc[:, ["female"] + demographics + household + village + dist]
-    )
-
-    reg_nine = sm.WLS(y, X, weights=reg_t7_9["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_9["village"]}
-    )
-
-    reg_t7_10 = df_10.dropna(how="any")
-
-    y = reg_t7_10["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_10.loc[:, ["female"] + demographics + household + village + dist]
-    )
-
-    reg_ten = sm.WLS(y, X, weights=reg_t7_10["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_10["village"]}
-    )
-
-    # * NOW WE WILL DO DIFF-IN-DIFF (GIRLS VS. BOYS; BH VS. JH) *
-    # * TABLE 7 - PANEL - C *
-
-    reg_t7_11 = df_11.dropna(how="any")
-
-    y = reg_t7_11["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_11.loc[
-            :,
-            ["female_bihar", "female", "bihar"]
-            + demographics
-            + household
-            + village
-            + dist,
-        ]
-    )
-
-    reg_eleven = sm.WLS(y, X, weights=reg_t7_11["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_11["village"]}
-    )
-
-    reg_t7_12 = df_12.dropna(how="any")
-
-    y = reg_t7_12["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_12.loc[
-            :,
-            ["female_bihar", "female", "bihar"]
-            + demographics
-            + household
-            + village
-            + dist,
-        ]
-    )
-
-    reg_twelve = sm.WLS(y, X, weights=reg_t7_12["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_12["village"]}
-    )
-
-    reg_t7_13 = df_13.dropna(how="any")
-
-    y = reg_t7_13["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_13.loc[
-            :,
-            ["female_bihar", "female", "bihar"]
-            + demographics
-            + household
-            + village
-            + dist,
-        ]
-    )
-
-    reg_thirteen = sm.WLS(y, X, weights=reg_t7_13["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_13["village"]}
-    )
-
-    reg_t7_14 = df_14.dropna(how="any")
-
-    y = reg_t7_14["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_14.loc[
-            :,
-            ["female_bihar", "female", "bihar"]
-            + demographics
-            + household
-            + village
-            + dist,
-        ]
-    )
-
-    reg_fourteen = sm.WLS(y, X, weights=reg_t7_14["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_14["village"]}
-    )
-
-    reg_t7_15 = df_15.dropna(how="any")
-
-    y = reg_t7_15["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_15.loc[
-            :,
-            ["female_bihar", "female", "bihar"]
-            + demographics
-            + household
-            + village
-            + dist,
-        ]
-    )
-
-    reg_fifteen = sm.WLS(y, X, weights=reg_t7_15["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_15["village"]}
-    )
-
-    # * NOW WE WILL DO DIFF-IN-DIFF (GIRLS VS. BOYS; BH VS. JH) FOR SHORT DISTANCE, I.E. IF SCHOOL IS GREATHER THAN 3 KMS *
-    # * TABLE 7 - PANEL - D *
-
-    reg_t7_16 = df_16.dropna(how="any")
-
-    y = reg_t7_16["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_16.loc[
-            :,
-            ["female_bihar", "female", "bihar"]
-            + demographics
-            + household
-            + village
-            + dist,
-        ]
-    )
-
-    reg_sixteen = sm.WLS(y, X, weights=reg_t7_16["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_16["village"]}
-    )
-
-    reg_t7_17 = df_17.dropna(how="any")
-
-    y = reg_t7_17["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_17.loc[
-            :,
-            ["female_bihar", "female", "bihar"]
-            + demographics
-            + household
-            + village
-            + dist,
-        ]
-    )
-
-    reg_seventeen = sm.WLS(y, X, weights=reg_t7_17["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_17["village"]}
-    )
-
-    reg_t7_18 = df_18.dropna(how="any")
-
-    y = reg_t7_18["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_18.loc[
-            :,
-            ["female_bihar", "female", "bihar"]
-            + demographics
-            + household
-            + village
-            + dist,
-        ]
-    )
-
-    reg_eighteen = sm.WLS(y, X, weights=reg_t7_18["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_18["village"]}
-    )
-
-    reg_t7_19 = df_19.dropna(how="any")
-
-    y = reg_t7_19["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_19.loc[
-            :,
-            ["female_bihar", "female", "bihar"]
-            + demographics
-            + household
-            + village
-            + dist,
-        ]
-    )
-
-    reg_nineteen = sm.WLS(y, X, weights=reg_t7_19["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_19["village"]}
-    )
-
-    reg_t7_20 = df_20.dropna(how="any")
-
-    y = reg_t7_20["enrollment_secschool"]
-    X = sm.add_constant(
-        reg_t7_20.loc[
-            :,
-            ["female_bihar", "female", "bihar"]
-            + demographics
-            + household
-            + village
-            + dist,
-        ]
-    )
+    df = _select_columns(dlhs_reg_data, all_vars + ["age", "longdist"])
+    df = df.loc[np.isfinite(df["bihar"])]
 
-    reg_twenty = sm.WLS(y, X, weights=reg_t7_20["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_t7_20["village"]}
-    )
+    ages = [13, 14, 15, 16, 17]
+    controls = demographics + household + village + dist
+
+    # every panel is one grouped regression over the ages, fitted on the rows
+    # without missing values in any of the table's variables
+    df_reg = df.loc[df["age"].isin(ages)].dropna(how="any", subset=all_vars)
+
+    # TABLE 7 - PANEL A AND B
+    # * SINGLE DIFFERENCE, GIRLS VS. BOYS, SEPARATELY IN BIHAR AND JHARKHAND *
+
+    gender_gap = fit_grouped_wls(
+        df_reg,
+        "enrollment_secschool",
+        ["female"] + controls,
+        "hhwt",
+        "village",
+        by=["bihar", "age"],
+    ).xs("female", level="term")
+
+    # * DIFF-IN-DIFF (GIRLS VS. BOYS; BH VS. JH) *
+    # TABLE 7 - PANEL C
+
+    differential_gap = fit_grouped_wls(
+        df_reg,
+        "enrollment_secschool",
+        ["female_bihar", "female", "bihar"] + controls,
+        "hhwt",
+        "village",
+        by=["age"],
+    ).xs("female_bihar", level="term")
+
+    # * THE SAME FOR VILLAGES 3 KMS OR FARTHER AWAY FROM A SECONDARY SCHOOL *
+    # TABLE 7 - PANEL D
+
+    differential_gap_long = fit_grouped_wls(
+        df_reg.loc[df_reg["longdist"] == 1],
+        "enrollment_secschool",
+        ["female_bihar", "female", "bihar"] + controls,
+        "hhwt",
+        "village",
+        by=["age"],
+    ).xs("female_bihar", level="term")
 
     ## FINDING AVERAGES
-    # PANEL A
-
-    av_1 = df_21["enrollment_secschool"].mean()
-    av_2 = df_22["enrollment_secschool"].mean()
-    av_3 = df_23["enrollment_secschool"].mean()
-    av_4 = df_24["enrollment_secschool"].mean()
-    av_5 = df_25["enrollment_secschool"].mean()
-
-    # PANEL B
+    boys_average = (
+        df.loc[df["age"].isin(ages) & (df["female"] == 0)]
+        .groupby(["bihar", "age"])["enrollment_secschool"]
+        .mean()
+    )
 
-    av_6 = df_26["enrollment_secschool"].mean()
-    av_7 = df_27["enrollment_secschool"].mean()
-    av_8 = df_28["enrollment_secschool"].mean()
-    av_9 = df_29["enrollment_secschool"].mean()
-    av_10 = df_30["enrollment_secschool"].mean()
+    panel_a = gender_gap.loc[1].loc[ages]
+    panel_b = gender_gap.loc[0].loc[ages]
+    panel_c = differential_gap.loc[ages]
+    panel_d = differential_gap_long.loc[ages]
 
     table_7_str = md(
         "||||||| \n"
@@ -1774,24 +882,24 @@ def table_7(dlhs_reg_data):
         "||Age=13|Age=14|Age=15|Age=16|Age=17|"
         "||(1)|(2)|(3)|(4)|(5)| \n"
         "|*Panel A. Gender gap in secondary schooling in age (bihar)*|||||| \n"
-        f"|Female|{round(reg_one.params['female'], 3)}|{round(reg_two.params['female'], 3)}|{round(reg_three.params['female'], 3)}|{round(reg_four.params['female'], 3)}|{round(reg_five.params['female'], 3)}| \n"
-        f"||({round(reg_one.bse['female'], 3)})|({round(reg_two.bse['female'], 3)})|({round(reg_three.bse['female'], 3)})|({round(reg_four.bse['female'], 3)})|({round(reg_five.bse['female'], 3)})| \n"
-        f"|Averages for boys|{round(float(av_1), 3)}|{round(float(av_2), 3)}|{round(float(av_3), 3)}|{round(float(av_4), 3)}|{round(float(av_5), 3)}| \n"
-        f"|Observations|{int(reg_one.nobs)}|{int(reg_two.nobs)}|{int(reg_three.nobs)}|{int(reg_four.nobs)}|{int(reg_five.nobs)}| \n"
-        "|*Panel B. Gender gap in secondary schooling in age (Jharkhand)*|||||| \n"
-        f"|Female|{round(reg_six.params['female'], 3)}|{round(reg_seven.params['female'], 3)}|{round(reg_eight.params['female'], 3)}|{round(reg_nine.params['female'], 3)}|{round(reg_ten.params['female'], 3)}| \n"
-        f"||({round(reg_six.bse['female'], 3)})|({round(reg_seven.bse['female'], 3)})|({round(reg_eight.bse['female'], 3)})|({round(reg_nine.bse['female'], 3)})|({round(reg_ten.bse['female'], 3)})| \n"
-        f"|Averages for boys|{round(float(av_6), 3)}|{round(float(av_7), 3)}|{round(float(av_8), 3)}|{round(float(av_9), 3)}|{round(float(av_10), 3)}| \n"
-        f"|Observations|{int(reg_six.nobs)}|{int(reg_seven.nobs)}|{int(reg_eight.nobs)}|{int(reg_nine.nobs)}|{int(reg_ten.nobs)}| \n"
-        "|*Panel C. Differential gender gap in secondary schooling by age (Bihar versus Jharkhand)*|||||| \n"
-        f"|Female x Bihar|{round(reg_eleven.params['female_bihar'], 3)}|{round(reg_twelve.params['female_bihar'], 3)}|{round(reg_thirteen.params['female_bihar'], 3)}|{round(reg_fourteen.params['female_bihar'], 3)}|{round(reg_fifteen.params['female_bihar'], 3)}| \n"
-        f"||({round(reg_eleven.bse['female_bihar'], 3)})|({round(reg_twelve.bse['female_bihar'], 3)})|({round(reg_thirteen.bse['female_bihar'], 3)})|({round(reg_fourteen.bse['female_bihar'], 3)})|({round(reg_fifteen.bse['female_bihar'], 3)})| \n"
-        f"|Observations|{int(reg_eleven.nobs)}|{int(reg_twelve.nobs)}|{int(reg_thirteen.nobs)}|{int(reg_fourteen.nobs)}|{int(reg_fifteen.nobs)}| \n"
-        "|*Panel D. Differential gender gap in secondary schooling by age (Bihar versus Jharkhand)-restricted to villages that are 3 km or farther away from a secondary school*|||||| \n"
-        f"|Female x Bihar|{round(reg_sixteen.params['female_bihar'], 3)}|{round(reg_seventeen.params['female_bihar'], 3)}|{round(reg_eighteen.params['female_bihar'], 3)}|{round(reg_nineteen.params['female_bihar'], 3)}|{round(reg_twenty.params['female_bihar'], 3)}| \n"
-        f"||({round(reg_sixteen.bse['female_bihar'], 3)})|({round(reg_seventeen.bse['female_bihar'], 3)})|({round(reg_eighteen.bse['female_bihar'], 3)})|({round(reg_nineteen.bse['female_bihar'], 3)})|({round(reg_twenty.bse['female_bihar'], 3)})| \n"
-        f"|Observations|{int(reg_sixteen.nobs)}|{int(reg_seventeen.nobs)}|{int(reg_eighteen.nobs)}|{int(reg_nineteen.nobs)}|{int(reg_twenty.nobs)}| \n"
-        "|Demographic controls|Yes|Yes|Yes|Yes|Yes| \n"
+        + _markdown_row("Female", panel_a["params"])
+        + _markdown_row("", panel_a["bse"], "({})")
+        + _markdown_row("Averages for boys", boys_average.loc[1].loc[ages])
+        + _markdown_row("Observations", panel_a["nobs"])
+        + "|*Panel B. Gender gap in secondary schooling in age (Jharkhand)*|||||| \n"
+        + _markdown_row("Female", panel_b["params"])
+        + _markdown_row("", panel_b["bse"], "({})")
+        + _markdown_row("Averages for boys", boys_average.loc[0].loc[ages])
+        + _markdown_row("Observations", panel_b["nobs"])
+        + "|*Panel C. Differential gender gap in secondary schooling by age (Bihar versus Jharkhand)*|||||| \n"
+        + _markdown_row("Female x Bihar", panel_c["params"])
+        + _markdown_row("", panel_c["bse"], "({})")
+        + _markdown_row("Observations", panel_c["nobs"])
+        + "|*Panel D. Differential gender gap in secondary schooling by age (Bihar versus Jharkhand)-restricted to villages that are 3 km or farther away from a secondary school*|||||| \n"
+        + _markdown_row("Female x Bihar", panel_d["params"])
+        + _markdown_row("", panel_d["bse"], "({})")
+        + _markdown_row("Observations", panel_d["nobs"])
+        + "|Demographic controls|Yes|Yes|Yes|Yes|Yes| \n"
         "|HH socioeconomic controls|Yes|Yes|Yes|Yes|Yes| \n"
         "|Village level controls|Yes|Yes|Yes|Yes|Yes| \n"
         "<td colspan=5>Notes: The demographic, socioeconomic, and village controls are the same as those shown in Table 2 and online Appendix Table A.1, and are included in all regressions (to enable comparison with Table 2, column 4). Standard errors, clustered by village ID, are in parentheses."
@@ -1800,113 +908,13 @@ def table_7(dlhs_reg_data):
 
 
 def table_8(dlhs_reg_data):
-    df = dlhs_reg_data.copy()
-    df.rename(
-        {"enrollment_middleschool": "Enrolled in or completed grade 8"},
-        axis=1,
-        inplace=True,
-    )
-
-    # regression 2 data
-    independent_variable = ["Enrolled in or completed grade 8"]
-
-    regression_variables_1 = [
-        "treat5_female_bihar",
-        "treat5_female",
-        "treat5_bihar",
-        "female_bihar",
-        "treat5",
-        "female",
-        "bihar",
-    ]
-
-    demographics = ["sc", "st", "obc", "hindu", "muslim"]
-
-    household = ["hhheadschool", "hhheadmale", "land", "bpl", "media", "electricity"]
-
-    village = ["middle", "bank", "postoff", "lcurrpop"]
-
-    dist = ["busdist", "towndist", "railwaydist", "hqdist"]
-
-    sample_weights = ["village", "hhwt"]
-
-    all_vars = (
-        independent_variable
-        + regression_variables_1
-        + demographics
-        + household
-        + village
-        + dist
-        + sample_weights
-    )
-
-    df_table_8 = df.loc[
-        (df["bihar"] == df["bihar"]) & (df["treat5"] == df["treat5"]),
-        all_vars,
-    ]
-
     # /* Table 8 */
 
     # * Triple Difference (w.r.t. Jharkhand) *
     # * The treatment group is 13 and 14 while the control group is 15 and 16 *
-
-    # COLUMN 1
-
-    y = df_table_8.loc[:, independent_variable]
-    X = sm.add_constant(df_table_8.loc[:, regression_variables_1])
-
-    reg_8_1 = sm.WLS(y, X, weights=df_table_8["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_table_8["village"]}
-    )
-
-    # COLUMN 2
-    X = sm.add_constant(df_table_8.loc[:, regression_variables_1 + demographics])
-
-    reg_8_2 = sm.WLS(y, X, weights=df_table_8["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": df_table_8["village"]}
-    )
-
-    reg_8_3 = df_table_8.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + demographics
-        + household
-        + sample_weights,
-    ].dropna(how="any")
-
-    y = reg_8_3[independent_variable]
-    X = sm.add_constant(
-        reg_8_3.loc[:, regression_variables_1 + demographics + household]
-    )
-    # COLUMN 3
-    reg_8_3 = sm.WLS(y, X, weights=reg_8_3["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_8_3["village"]}
-    )
-
-    # COLUMN 4
-    reg_8_4 = df_table_8.loc[
-        :,
-        independent_variable
-        + regression_variables_1
-        + demographics
-        + household
-        + sample_weights
-        + village
-        + dist,
-    ].dropna(how="any")
-
-    y = reg_8_4[independent_variable]
-    X = sm.add_constant(
-        reg_8_4.loc[
-            :, regression_variables_1 + demographics + household + village + dist
-        ]
-    )
-
-    reg_8_4 = sm.WLS(y, X, weights=reg_8_4["hhwt"]).fit(
-        cov_type="cluster", cov_kwds={"groups": reg_8_4["village"]}
+    reg_8_1, reg_8_2, reg_8_3, reg_8_4 = fit_registered_specifications(
+        dlhs_reg_data, _TABLE_SPECIFICATIONS["table_8"]
     )
-    reg_8_4.summary()
 
     ## Table creation with stargazer package
     stargazer = Stargazer(
@@ -2026,7 +1034,8 @@ def create_table1(regression_data):
     """
     Creates Table 1.
     """
-    variables = regression_data[
+    variables = _select_columns(
+        regression_data,
         [
             "enrollment_secschool",
             "treat1_female_bihar",
@@ -2044,8 +1053,8 @@ def create_table1(regression_data):
             "female_longdist",
             "bihar_longdist",
             "longdist",
-        ]
-    ]
+        ],
+    )
 
     table1 = pd.DataFrame()
     table1["Minimum"] = variables.min()
@@ -2091,27 +1100,111 @@ def gen_post_1(value):
         return np.nan
 
 
+def _exam_window_sums(exam_data, years):
+    # cumulative sums over the years of the exam totals and of their
+    # non-missing counts, per school and gender, with a leading zero column:
+    # the mean over years[i:j] is (sum[:, j] - sum[:, i]) / (count[:, j] - count[:, i])
+    keys = ["school_code", "statecode", "gender", "statename"]
+    df = exam_data.loc[exam_data["year"].isin(years)]
+    grouped = df.astype({key: "category" for key in keys}).groupby(
+        keys + ["year"], observed=True
+    )[["appear_tot", "pass_tot"]]
+    sums = grouped.sum().unstack("year", fill_value=0)
+    counts = grouped.count().unstack("year", fill_value=0)
+    cumulative = {}
+    for value in ["appear_tot", "pass_tot"]:
+        cumulative[value] = [
+            np.pad(
+                frame[value].reindex(columns=years, fill_value=0).to_numpy().cumsum(1),
+                ((0, 0), (1, 0)),
+            )
+            for frame in [sums, counts]
+        ]
+    return sums.index.to_frame(index=False), cumulative
+
+
+def placebo_window_sweep(exam_data, first_year=2004, last_year=2010, exclude=(2008,)):
+    # The DDD of table 4 for every pair of a pre window and a later post window
+    # of consecutive exam years between first_year and last_year (without the
+    # excluded years). The school and gender sums per year are computed once,
+    # so the window means of every pair come from differences of cumulative
+    # sums. Returns the triple coefficient, its HC1 standard error and the
+    # number of observations, indexed by the windows and the outcome
+    exam_years = set(exam_data["year"].unique())
+    years = [
+        year
+        for year in range(first_year, last_year + 1)
+        if year not in exclude and year in exam_years
+    ]
+    groups, cumulative = _exam_window_sums(exam_data, years)
+    treat = (groups["statecode"] == 1).astype(int).to_numpy()
+    female = (groups["gender"] == 2).astype(int).to_numpy()
+    design = pd.DataFrame(
+        {
+            "treat": np.r_[treat, treat],
+            "female": np.r_[female, female],
+            "post": np.r_[np.zeros_like(treat), np.ones_like(treat)],
+        }
+    )
+    design["triple"] = design["treat"] * design["post"] * design["female"]
+    design["female_treat"] = design["female"] * design["treat"]
+    design["bh_post"] = design["treat"] * design["post"]
+    design["female_post"] = design["female"] * design["post"]
+    X = sm.add_constant(
+        design[
+            [
+                "triple",
+                "female_treat",
+                "bh_post",
+                "female_post",
+                "female",
+                "treat",
+                "post",
+            ]
+        ]
+    )
+
+    index, rows = [], []
+    n = len(years)
+    for pre_start, pre_end, post_start, post_end in [
+        (a, b, c, d)
+        for a in range(n)
+        for b in range(a, n)
+        for c in range(b + 1, n)
+        for d in range(c, n)
+    ]:
+        for outcome, value in [("lappear", "appear_tot"), ("lpass", "pass_tot")]:
+            sums, counts = cumulative[value]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                means = np.r_[
+                    (sums[:, pre_end + 1] - sums[:, pre_start])
+                    / (counts[:, pre_end + 1] - counts[:, pre_start]),
+                    (sums[:, post_end + 1] - sums[:, post_start])
+                    / (counts[:, post_end + 1] - counts[:, post_start]),
+                ]
+                y = np.log(means)
+            # schools and genders with the outcome in both windows
+            finite = np.isfinite(y)
+            balanced = np.tile(finite[: len(treat)] & finite[len(treat) :], 2)
+            res = sm.OLS(y[balanced], X.loc[balanced]).fit(cov_type="HC1")
+            index.append(
+                (years[pre_start], years[pre_end], years[post_start], years[post_end])
+                + (outcome,)
+            )
+            rows.append((res.params["triple"], res.bse["triple"], int(res.nobs)))
+
+    return pd.DataFrame(
+        rows,
+        columns=["params", "bse", "nobs"],
+        index=pd.MultiIndex.from_tuples(
+            index, names=["pre_start", "pre_end", "post_start", "post_end", "outcome"]
+        ),
+    )
+
+
 def table_9(exam_data):
-    df = exam_data.copy()
-    df = df.loc[df["year"] != 2008].copy()
-    df["post"] = df["year"].apply(gen_post_1)
-    df_mean = df.groupby(["school_code", "statecode", "post", "gender", "statename"])[
-        ["appear_tot", "pass_tot", "district_code"]
-    ].apply(lambda x: x.mean(skipna=True))
-    df_mean.reset_index(inplace=True)
-    df_mean["treat"] = df_mean["statecode"].apply(lambda x: 1 if x == 1 else 0)
-    df_mean["male"] = df_mean["gender"].apply(lambda x: 1 if x == 1 else 0)
-    df_mean["female"] = df_mean["gender"].apply(lambda x: 1 if x == 2 else 0)
-    df_mean["bh_post"] = df_mean["treat"] * df_mean["post"]
-    df_mean["female_post"] = df_mean["female"] * df_mean["post"]
-    df_mean["female_treat"] = df_mean["female"] * df_mean["treat"]
-    df_mean["triple"] = df_mean["treat"] * df_mean["post"] * df_mean["female"]
-    df_mean["lappear"] = np.log(df_mean["appear_tot"])
-    df_mean["lpass"] = np.log(df_mean["pass_tot"])
-    df_1 = df_mean.copy()
-    gp = df_1.groupby(["school_code", "gender"])["lappear"]
-    df_1["sch_gender_prepost_appear"] = gp.transform(lambda x: np.isfinite(x).sum())
-    reg_df = df_1.loc[df_1["sch_gender_prepost_appear"] == 2]
+    df_1 = _exam_school_means(exam_data, gen_post_1)
+    reg_df = df_1.loc[_prepost_balanced(df_1, "lappear")]
     X = sm.add_constant(
         reg_df.loc[
             :,
@@ -2130,9 +1223,7 @@ def table_9(exam_data):
     model = sm.OLS(y, X)
     res_1 = model.fit(cov_type="HC1")
 
-    gp = df_1.groupby(["school_code", "gender"])["lpass"]
-    df_1["sch_gender_prepost_pass"] = gp.transform(lambda x: np.isfinite(x).sum())
-    reg_df = df_1.loc[df_1["sch_gender_prepost_pass"] == 2]
+    reg_df = df_1.loc[_prepost_balanced(df_1, "lpass")]
     X = sm.add_constant(
         reg_df.loc[
             :,
@@ -2152,7 +1243,9 @@ def table_9(exam_data):
     res_2 = model.fit(cov_type="HC1")
 
     ## Table creation with stargazer package
-    stargazer = Stargazer([res_1, res_2])
+    stargazer = Stargazer(
+        [RegressionRecord.from_results(res_1), RegressionRecord.from_results(res_2)]
+    )
     stargazer.title("Table 9")
     # stargazer.custom_columns(
     #    "Triple difference (DDD) estimate of impact of exposure to cycle program"
@@ -2202,6 +1295,7 @@ def table_9(exam_data):
 
 
 def table_5_panel_a(dlhs_reg_data):
+    dlhs_reg_data = _select_columns(dlhs_reg_data, ['female', 'state', 'age', 'bihar', 'currgrade'])
     df = dlhs_reg_data.loc[(np.isfinite(dlhs_reg_data['bihar'])) & dlhs_reg_data['age'].between(12, 18, inclusive=True)] 
     panel_a = df.loc[df['currgrade'] == 9].copy()
     total_n = panel_a.groupby(['female'])['age'].value_counts(False).to_frame('freq')
@@ -2221,6 +1315,7 @@ def table_5_panel_a(dlhs_reg_data):
     return table_five_a
 
 def table_5_panel_b(dlhs_reg_data):
+    dlhs_reg_data = _select_columns(dlhs_reg_data, ['female', 'state', 'age', 'bihar', 'currgrade'])
     df_2 = dlhs_reg_data.loc[(np.isfinite(dlhs_reg_data['bihar'])) & dlhs_reg_data['age'].between(13, 17, inclusive=True)] 
     panel_b = df_2.copy()
     total_n = panel_b.groupby(['female'])['age'].value_counts(False).to_frame('freq')
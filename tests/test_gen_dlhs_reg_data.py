@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from auxiliary.auxiliary_data_management import gen_dlhs_reg_data
+from tests.reference_dlhs_reg_data import gen_dlhs_reg_data as reference_gen_dlhs_reg_data
+
+
+def _synthetic_dlhs_long(n, seed, nan_frac=0.03):
+    ## A synthetic DLHS extract with the columns gen_dlhs_reg_data reads, coded as in the
+    # survey, with missing values and the 99 code of missing distances
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame()
+    df['state'] = rng.choice([10, 20, 9], n).astype(float)
+    dist_bihar = rng.choice([1010, 1022, 1001, 1002, 1034], n)
+    dist_jharkhand = rng.choice([2001, 2002, 2010, 2011], n)
+    df['dist'] = np.where(df['state'] == 10, dist_bihar, dist_jharkhand).astype(float)
+    df['village'] = rng.integers(0, 150, n).astype(float)
+    df['vpsu'] = df['village']
+    df['age'] = rng.integers(11, 19, n).astype(float)
+    df['hhwt'] = rng.uniform(0.5, 2, n)
+    df['hhheadmale'] = rng.integers(0, 2, n).astype(float)
+    df['hhheadschool'] = rng.integers(0, 12, n).astype(float)
+    df['school'] = rng.choice([1, 2, 3], n).astype(float)
+    df['grade'] = rng.integers(0, 12, n).astype(float)
+    df['sex'] = rng.choice([1, 2], n).astype(float)
+    df['relationship'] = rng.integers(1, 12, n).astype(float)
+    df['hv116b'] = rng.integers(1, 6, n).astype(float)
+    df['hv115'] = rng.integers(1, 5, n).astype(float)
+    for item in 'abcdefghijklmnopqrstuvwxy':
+        df['hv129' + item] = rng.choice([0, 1, 2], n).astype(float)
+    df['hv130'] = rng.choice([1, 2], n).astype(float)
+    df['hv131'] = rng.integers(0, 10, n).astype(float)
+    df['hv134'] = rng.choice([1, 2, 8], n).astype(float)
+    for level in 'abcde':
+        df['v115' + level + 'a1'] = rng.choice([1, 2], n, p=[0.2, 0.8]).astype(float)
+        df['v115' + level + 'b1'] = rng.choice([1, 2], n, p=[0.2, 0.8]).astype(float)
+        df['v115' + level + '2'] = np.round(rng.uniform(0.5, 12, n), 1)
+    df.loc[rng.random(n) < 0.01, 'v115c2'] = 99.0
+    df['v122a'] = rng.choice([1, 2], n).astype(float)
+    df['v122d'] = rng.choice([1, 2], n).astype(float)
+    for column in ['v110', 'v111', 'v112', 'v113']:
+        df[column] = rng.uniform(0, 40, n).round()
+    df['v101a'] = rng.uniform(100, 5000, n).round()
+    df['v101b'] = rng.uniform(100, 5000, n).round()
+    df['v102'] = rng.integers(10, 500, n).astype(float)
+    missing = ['grade', 'hv131', 'hhheadschool', 'v110', 'hv129n', 'hv134', 'v101b', 'v115c2', 'age', 'hv116b']
+    for column in missing:
+        df.loc[rng.random(n) < nan_frac, column] = np.nan
+    return df
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_gen_dlhs_reg_data_matches_row_wise_reference(seed):
+    dlhs_long = _synthetic_dlhs_long(5000, seed)
+    pd.testing.assert_frame_equal(
+        gen_dlhs_reg_data(dlhs_long), reference_gen_dlhs_reg_data(dlhs_long)
+    )